@@ -0,0 +1,185 @@
+import json
+import os
+import random
+from typing import Any
+
+
+class DumpGenerator:
+    """Генерация синтетических .har файлов и дампов ответов api для замеров производительности.
+
+    Форма данных задаётся параметрами: количество записей, ширина объектов, длина строк, глубина вложенности,
+    длина массивов и разнородность значений. Генерация зависит только от параметров и зерна,
+    поэтому одинаковые параметры дают одинаковые файлы.
+
+    """
+
+    SCALAR_TYPES = ("string", "integer", "number", "boolean", "null")
+
+    def __init__(self,
+                 entries: int = 1000,
+                 har_files: int = 1,
+                 endpoints: int = 20,
+                 api_files: int = 5,
+                 properties_count: int = 8,
+                 string_length: int = 32,
+                 depth: int = 2,
+                 array_length: int = 5,
+                 heterogeneity: float = 0.1,
+                 seed: int = 0):
+        """Конструктор класса.
+
+        :param entries: Количество записей в каждом .har файле.
+        :param har_files: Количество .har файлов.
+        :param endpoints: Количество эндпоинтов, по которым распределяются записи и дампы ответов api.
+        :param api_files: Количество дампов ответов api на эндпоинт.
+        :param properties_count: Количество свойств в каждом объекте тела.
+        :param string_length: Длина строковых значений.
+        :param depth: Глубина вложенности объектов тела.
+        :param array_length: Длина массивов в теле.
+        :param heterogeneity: Вероятность от 0 до 1, с которой значение получает случайный тип,
+            а свойство - случайное имя. При 0 все тела эндпоинта описываются одной и той же схемой.
+        :param seed: Зерно генератора случайных чисел.
+
+        """
+        self.entries = entries
+        self.har_files = har_files
+        self.endpoints = endpoints
+        self.api_files = api_files
+        self.properties_count = properties_count
+        self.string_length = string_length
+        self.depth = depth
+        self.array_length = array_length
+        self.heterogeneity = heterogeneity
+        self.seed = seed
+        self._random = random.Random(seed)
+
+    def get_params(self) -> dict:
+        """Получение параметров генерации для отчёта о замерах.
+
+        :return: Параметры генерации.
+
+        """
+        return {key: value for key, value in self.__dict__.items() if not key.startswith("_")}
+
+    def _make_scalar(self, scalar_type: str) -> Any:
+        """Генерация скалярного значения.
+
+        :param scalar_type: Тип значения из SCALAR_TYPES.
+        :return: Значение.
+
+        """
+        rnd = self._random
+        if scalar_type == "string":
+            return "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(self.string_length))
+        elif scalar_type == "integer":
+            return rnd.randint(-10 ** 6, 10 ** 6)
+        elif scalar_type == "number":
+            return round(rnd.uniform(-10 ** 6, 10 ** 6), 3)
+        elif scalar_type == "boolean":
+            return rnd.random() < 0.5
+        return None
+
+    def make_payload(self, depth: int = None) -> Any:
+        """Генерация тела запроса или ответа.
+
+        Каждый объект содержит properties_count свойств: на последнем уровне - скалярные значения, на остальных -
+        вложенный объект и массив из array_length объектов следующего уровня.
+
+        :param depth: Оставшаяся глубина вложенности. По умолчанию depth из параметров.
+        :return: Тело запроса или ответа.
+
+        """
+        if depth is None:
+            depth = self.depth
+
+        rnd = self._random
+        payload = {}
+        for idx in range(self.properties_count):
+            if rnd.random() < self.heterogeneity:
+                prop = f"field_{rnd.randint(0, self.properties_count * 10)}"
+                scalar_type = rnd.choice(self.SCALAR_TYPES)
+            else:
+                prop = f"field_{idx}"
+                scalar_type = self.SCALAR_TYPES[idx % len(self.SCALAR_TYPES)]
+
+            if depth > 0 and idx == 0:
+                payload[prop] = self.make_payload(depth=depth - 1)
+            elif depth > 0 and idx == 1:
+                payload[prop] = [self.make_payload(depth=depth - 1) for _ in range(self.array_length)]
+            else:
+                payload[prop] = self._make_scalar(scalar_type=scalar_type)
+
+        return payload
+
+    def make_har_entry(self) -> dict:
+        """Генерация записи .har файла.
+
+        :return: Запись .har файла.
+
+        """
+        rnd = self._random
+        endpoint_idx = rnd.randrange(self.endpoints)
+        method = "POST" if rnd.random() < 0.3 else "GET"
+
+        entry = {
+            "_resourceType": "xhr",
+            "request": {
+                "method": method,
+                "url": f"https://benchmark.example/api/v1/endpoint_{endpoint_idx}?page={rnd.randint(1, 100)}",
+                "headers": [{"name": "Accept", "value": "application/json"}]
+            },
+            "response": {
+                "status": 200,
+                "headers": [{"name": "Content-Type", "value": "application/json"}],
+                "content": {"mimeType": "application/json", "text": json.dumps(self.make_payload())}
+            }
+        }
+        if method == "POST":
+            entry["request"]["postData"] = {"mimeType": "application/json", "text": json.dumps(self.make_payload())}
+
+        return entry
+
+    def write_har_files(self, path_to_har_dir: str) -> list:
+        """Запись .har файлов.
+
+        :param path_to_har_dir: Каталог для .har файлов.
+        :return: Пути к записанным файлам.
+
+        """
+        os.makedirs(path_to_har_dir, exist_ok=True)
+        paths_to_files = []
+
+        for file_idx in range(self.har_files):
+            path_to_file = os.path.join(path_to_har_dir, f"benchmark_{file_idx}.har")
+            with open(path_to_file, "w", encoding="UTF-8") as har_file:
+                # Записи пишутся по одной, чтобы не держать весь файл в памяти
+                har_file.write('{"log": {"version": "1.2", "creator": {"name": "benchmark"}, "pages": [], "entries": [')
+                for entry_idx in range(self.entries):
+                    if entry_idx:
+                        har_file.write(", ")
+                    har_file.write(json.dumps(self.make_har_entry()))
+                har_file.write("]}}")
+            paths_to_files.append(path_to_file)
+
+        return paths_to_files
+
+    def write_api_dumps(self, path_to_api_dir: str) -> list:
+        """Запись дампов ответов api, по каталогу на эндпоинт.
+
+        :param path_to_api_dir: Каталог для дампов ответов api.
+        :return: Пути к записанным файлам.
+
+        """
+        paths_to_files = []
+
+        for endpoint_idx in range(self.endpoints):
+            path_to_endpoint_dir = os.path.join(path_to_api_dir, f"endpoint_{endpoint_idx}")
+            os.makedirs(path_to_endpoint_dir, exist_ok=True)
+
+            for file_idx in range(self.api_files):
+                path_to_file = os.path.join(path_to_endpoint_dir, f"response_{file_idx}.json")
+                with open(path_to_file, "w", encoding="UTF-8") as api_file:
+                    json.dump(self.make_payload(), api_file, ensure_ascii=False, indent=4)
+                paths_to_files.append(path_to_file)
+
+        return paths_to_files
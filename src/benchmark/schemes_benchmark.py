@@ -0,0 +1,248 @@
+import argparse
+import copy
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Any
+
+from loguru import logger
+
+from src.benchmark.dump_generator import DumpGenerator
+from src.codec.codec import JSONCodec
+from src.configs.config import get_config_json
+from src.generator.generator import SchemaGenerator
+from src.processor.json_schemes_generator import SOWASchemesGenerator
+
+
+class SchemesBenchmark:
+    """Замеры производительности этапов генерации схем на синтетических дампах.
+
+    Дампы создаются DumpGenerator во временном каталоге с той же структурой, что и у проекта
+    (dumps/har, dumps/api, schemes), генерация запускается из его подкаталога src, как и main.py.
+    Каждый этап build_sowa_schemes замеряется отдельно: результат предыдущего этапа полностью
+    материализуется до начала следующего. Кэш схем не используется, схемы каждого повтора пишутся
+    в новый каталог, поэтому повторы не влияют друг на друга.
+
+    """
+
+    STAGES = ("parse_dump_file", "get_frames", "merge_frames", "write_schema", "build_sowa_schemes")
+
+    def __init__(self, config_json: dict, dump_generator: DumpGenerator, repeat: int = 3, path_to_workdir: str = None):
+        """Конструктор класса.
+
+        :param config_json: Конфигурация, из которой берутся VARIABLES и REPLACE_PATTERNS.
+        :param dump_generator: Генератор синтетических дампов.
+        :param repeat: Количество повторов каждого замера.
+        :param path_to_workdir: Каталог для дампов и схем. По умолчанию временный каталог, удаляемый после замеров.
+
+        """
+        self.config_json = config_json
+        self.dump_generator = dump_generator
+        self.repeat = max(1, repeat)
+        self.path_to_workdir = path_to_workdir
+
+    @staticmethod
+    def _measure(func: Callable[[], Any]) -> tuple[float, Any]:
+        """Замер времени выполнения функции.
+
+        :param func: Функция без аргументов.
+        :return: Время выполнения в секундах и результат функции.
+
+        """
+        started_at = time.perf_counter()
+        result = func()
+        return time.perf_counter() - started_at, result
+
+    @staticmethod
+    def _summarize(timings: list) -> dict:
+        """Сводка по повторам замера.
+
+        :param timings: Время каждого повтора в секундах.
+        :return: Минимальное, медианное и максимальное время и время каждого повтора.
+
+        """
+        return {
+            "min_seconds": min(timings),
+            "median_seconds": statistics.median(timings),
+            "max_seconds": max(timings),
+            "runs_seconds": timings
+        }
+
+    def _make_config(self, path_to_schemes_dir: str) -> dict:
+        """Получение конфигурации для запуска генератора на синтетических дампах.
+
+        :param path_to_schemes_dir: Каталог для схем относительно каталога src.
+        :return: Конфигурация.
+
+        """
+        config_json = copy.deepcopy(self.config_json)
+        config_json["HAR_FILES_DIR"] = "../dumps/har"
+        config_json["API_FILES_DIR"] = "../dumps/api"
+        config_json["JSON_SCHEMES_DIR"] = path_to_schemes_dir
+        config_json["SKIP_FRAMES_LIST"] = []
+        config_json.pop("SCHEMES_CACHE_PATH", None)
+        config_json.pop("SCHEMES_INDEX_PATH", None)
+        config_json.pop("RUN_REPORT_PATH", None)
+        return config_json
+
+    def run_stages(self, is_from_har: bool) -> dict:
+        """Замер этапов build_sowa_schemes для .har файлов или дампов ответов api.
+
+        :param is_from_har: Замерять генерацию из .har файлов, иначе из дампов ответов api.
+        :return: Сводка по этапам и количество запросов, кадров и схем.
+
+        """
+        source = "har" if is_from_har else "api"
+        timings = {stage: [] for stage in self.STAGES}
+        counts = {}
+
+        for run_idx in range(self.repeat):
+            config_json = self._make_config(path_to_schemes_dir=f"../schemes/{source}_{run_idx}/")
+            generator = SOWASchemesGenerator(config_json=config_json,
+                                             is_from_har=is_from_har,
+                                             is_from_api=not is_from_har,
+                                             use_schema_cache=False)
+
+            elapsed, entries = self._measure(lambda: list(generator.parse_dump_file()))
+            timings["parse_dump_file"].append(elapsed)
+
+            elapsed, frames = self._measure(lambda: list(generator.get_frames(entries=entries)))
+            timings["get_frames"].append(elapsed)
+
+            elapsed, merged_frames = self._measure(lambda: generator.merge_frames(frames=frames))
+            timings["merge_frames"].append(elapsed)
+
+            def write_schemes():
+                for frame in merged_frames.values():
+                    SOWASchemesGenerator.write_schema(frame=generator.set_path_to_schema(frame=frame),
+                                                      schema_writer=generator.schema_writer)
+                generator.schema_writer.flush()
+
+            elapsed, _ = self._measure(write_schemes)
+            timings["write_schema"].append(elapsed)
+
+            counts = {"entries": len(entries), "frames": len(frames), "merged_frames": len(merged_frames)}
+
+            config_json = self._make_config(path_to_schemes_dir=f"../schemes/{source}_full_{run_idx}/")
+            generator = SOWASchemesGenerator(config_json=config_json,
+                                             is_from_har=is_from_har,
+                                             is_from_api=not is_from_har,
+                                             use_schema_cache=False)
+            elapsed, _ = self._measure(generator.build_sowa_schemes)
+            timings["build_sowa_schemes"].append(elapsed)
+
+        stages = {stage: self._summarize(stage_timings) for stage, stage_timings in timings.items()}
+        stages["build_sowa_schemes"]["entries_per_second"] = \
+            counts["entries"] / stages["build_sowa_schemes"]["median_seconds"] \
+            if stages["build_sowa_schemes"]["median_seconds"] else None
+
+        return {"counts": counts, "stages": stages}
+
+    def run_to_dict(self) -> dict:
+        """Замер SchemaGenerator.to_dict отдельно от чтения и объединения.
+
+        :return: Сводка по замеру и количество тел.
+
+        """
+        options = self.config_json["VARIABLES"]["json_schema_options"]
+        payload_generator = DumpGenerator(**{**self.dump_generator.get_params(), "seed": self.dump_generator.seed + 1})
+        payloads = [payload_generator.make_payload() for _ in range(self.dump_generator.entries)]
+
+        timings = []
+        for _ in range(self.repeat):
+            elapsed, _ = self._measure(lambda: [SchemaGenerator(payload).to_dict(options=options)
+                                                for payload in payloads])
+            timings.append(elapsed)
+
+        summary = self._summarize(timings)
+        summary["payloads_per_second"] = len(payloads) / summary["median_seconds"] if summary["median_seconds"] else None
+        return {"counts": {"payloads": len(payloads)}, "stages": {"to_dict": summary}}
+
+    def run(self) -> dict:
+        """Создание дампов и замер всех этапов.
+
+        :return: Отчёт о замерах.
+
+        """
+        path_to_workdir = self.path_to_workdir or tempfile.mkdtemp(prefix="schemes_benchmark_")
+        path_to_src_dir = os.path.join(path_to_workdir, "src")
+        os.makedirs(path_to_src_dir, exist_ok=True)
+        path_to_cwd = os.getcwd()
+
+        try:
+            elapsed, _ = self._measure(lambda: (
+                self.dump_generator.write_har_files(os.path.join(path_to_workdir, "dumps", "har")),
+                self.dump_generator.write_api_dumps(os.path.join(path_to_workdir, "dumps", "api"))))
+            logger.info(f"Синтетические дампы созданы за {elapsed:.2f} с: {path_to_workdir}")
+
+            # Пути в конфигурации и разбор путей дампов api рассчитаны на запуск из каталога src
+            os.chdir(path_to_src_dir)
+            results = {
+                "har": self.run_stages(is_from_har=True),
+                "api": self.run_stages(is_from_har=False),
+                "schema_generator": self.run_to_dict()
+            }
+        finally:
+            os.chdir(path_to_cwd)
+            if self.path_to_workdir is None:
+                shutil.rmtree(path_to_workdir, ignore_errors=True)
+
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "json_codec": JSONCodec.name,
+            "repeat": self.repeat,
+            "dump_params": self.dump_generator.get_params(),
+            "results": results
+        }
+
+
+if __name__ == '__main__':
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    parser = argparse.ArgumentParser(description="Замеры производительности генерации json схем")
+    parser.add_argument("--output", default="benchmark_results.json", help="Файл для записи результатов в JSON")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество повторов каждого замера")
+    parser.add_argument("--workdir", default=None, help="Каталог для дампов и схем, по умолчанию временный")
+    parser.add_argument("--entries", type=int, default=1000, help="Количество записей в каждом .har файле")
+    parser.add_argument("--har-files", type=int, default=1, help="Количество .har файлов")
+    parser.add_argument("--endpoints", type=int, default=20, help="Количество эндпоинтов")
+    parser.add_argument("--api-files", type=int, default=5, help="Количество дампов ответов api на эндпоинт")
+    parser.add_argument("--properties-count", type=int, default=8, help="Количество свойств в объектах тела")
+    parser.add_argument("--string-length", type=int, default=32, help="Длина строковых значений")
+    parser.add_argument("--depth", type=int, default=2, help="Глубина вложенности объектов тела")
+    parser.add_argument("--array-length", type=int, default=5, help="Длина массивов в теле")
+    parser.add_argument("--heterogeneity", type=float, default=0.1, help="Разнородность значений от 0 до 1")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генератора дампов")
+    args = parser.parse_args()
+
+    config_json = get_config_json()
+    JSONCodec.use(config_json.get("VARIABLES").get("json_codec", "auto"))
+
+    benchmark = SchemesBenchmark(config_json=config_json,
+                                 dump_generator=DumpGenerator(entries=args.entries,
+                                                              har_files=args.har_files,
+                                                              endpoints=args.endpoints,
+                                                              api_files=args.api_files,
+                                                              properties_count=args.properties_count,
+                                                              string_length=args.string_length,
+                                                              depth=args.depth,
+                                                              array_length=args.array_length,
+                                                              heterogeneity=args.heterogeneity,
+                                                              seed=args.seed),
+                                 repeat=args.repeat,
+                                 path_to_workdir=args.workdir)
+    report = benchmark.run()
+
+    with open(args.output, "w", encoding="UTF-8") as output_file:
+        json.dump(report, output_file, ensure_ascii=False, indent=4)
+    print(json.dumps({source: result["stages"] for source, result in report["results"].items()}, indent=4))
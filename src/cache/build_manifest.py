@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+from loguru import logger
+
+from src.codec.codec import JSONCodec
+
+
+class BuildManifest:
+    """Манифест инкрементальной сборки схем.
+
+    Для каждого файла дампа хранится размер, время изменения, хэш содержимого и объединённые кадры,
+    полученные из этого файла. Файл считается неизменившимся, если совпадают размер и время изменения
+    или, при их расхождении, хэш содержимого.
+
+    """
+
+    # Меняется при изменении алгоритма генерации или формата манифеста
+    MANIFEST_VERSION = 2
+
+    def __init__(self, path_to_manifest: str, build_settings: dict):
+        """Конструктор класса.
+
+        :param path_to_manifest: Путь к файлу манифеста.
+        :param build_settings: Настройки генерации, при изменении которых манифест считается недействительным.
+
+        """
+        self.path_to_manifest = path_to_manifest
+        self._fingerprint = hashlib.blake2b(
+            json.dumps({"version": self.MANIFEST_VERSION, "settings": build_settings}, sort_keys=True).encode("utf-8"),
+            digest_size=20).hexdigest()
+        self.files = {}
+
+    def __getstate__(self) -> dict:
+        """Состояние для передачи в процесс пула без записей файлов: манифест используется только
+        в родительском процессе, а кадры всех файлов увеличивали бы каждую передаваемую порцию запросов.
+
+        :return: Состояние объекта.
+
+        """
+        state = self.__dict__.copy()
+        state["files"] = {}
+        return state
+
+    def load(self):
+        """Чтение манифеста. Манифест другой версии или с другими настройками генерации не используется."""
+        self.files = {}
+
+        if not os.path.exists(self.path_to_manifest):
+            logger.info(f"Манифест сборки не найден, будут обработаны все файлы")
+            return
+
+        with open(self.path_to_manifest, "r", encoding="UTF-8") as manifest_file:
+            manifest = JSONCodec.load(manifest_file)
+
+        if manifest.get("fingerprint") != self._fingerprint:
+            logger.info(f"Настройки генерации изменились, будут обработаны все файлы")
+            return
+
+        self.files = manifest.get("files", {})
+
+    def save(self):
+        """Запись манифеста через временный файл, чтобы не оставить его частично записанным."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path_to_manifest)), exist_ok=True)
+        path_to_tmp_manifest = f"{self.path_to_manifest}.tmp"
+
+        with open(path_to_tmp_manifest, "w", encoding="UTF-8") as manifest_file:
+            JSONCodec.dump({"fingerprint": self._fingerprint, "files": self.files}, manifest_file, ensure_ascii=False)
+        os.replace(path_to_tmp_manifest, self.path_to_manifest)
+
+    @staticmethod
+    def get_file_hash(path_to_file: str) -> str:
+        """Вычисление хэша содержимого файла.
+
+        :param path_to_file: Путь к файлу.
+        :return: Хэш содержимого.
+
+        """
+        file_hash = hashlib.blake2b(digest_size=20)
+        with open(path_to_file, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                file_hash.update(chunk)
+
+        return file_hash.hexdigest()
+
+    def get_unchanged_frames(self, path_to_file: str) -> Optional[dict]:
+        """Получение сохранённых кадров файла, если файл не изменился.
+
+        :param path_to_file: Путь к файлу дампа.
+        :return: Объединённые кадры файла или None, если файл новый или изменился.
+
+        """
+        record = self.files.get(path_to_file)
+        if record is None:
+            return None
+
+        stat = os.stat(path_to_file)
+        if record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+            return record["frames"]
+
+        if record["size"] == stat.st_size and record["hash"] == self.get_file_hash(path_to_file):
+            record["mtime_ns"] = stat.st_mtime_ns
+            return record["frames"]
+
+        return None
+
+    def get_frames(self, path_to_file: str) -> dict:
+        """Получение сохранённых кадров файла независимо от его изменения.
+
+        :param path_to_file: Путь к файлу дампа.
+        :return: Объединённые кадры файла или пустой словарь.
+
+        """
+        record = self.files.get(path_to_file)
+        return record["frames"] if record else {}
+
+    def update(self, path_to_file: str, frames: dict):
+        """Сохранение кадров обработанного файла.
+
+        :param path_to_file: Путь к файлу дампа.
+        :param frames: Объединённые кадры файла. Не должны изменяться после сохранения.
+
+        """
+        stat = os.stat(path_to_file)
+        self.files[path_to_file] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": self.get_file_hash(path_to_file),
+            "frames": frames
+        }
+
+    def remove_missing(self, paths_to_files: list) -> dict:
+        """Удаление из манифеста файлов, которых больше нет среди дампов.
+
+        :param paths_to_files: Актуальный список файлов дампов.
+        :return: Удалённые записи манифеста.
+
+        """
+        actual_paths = set(paths_to_files)
+        removed_files = {path: record for path, record in self.files.items() if path not in actual_paths}
+
+        for path in removed_files:
+            del self.files[path]
+
+        return removed_files
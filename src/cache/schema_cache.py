@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Optional
+
+from loguru import logger
+
+from src.codec.codec import JSONCodec
+
+
+class SchemaCache:
+    """Дисковый кэш JSON схем, ключ - хэш полезной нагрузки и опций генерации схемы.
+
+    Кэш хранится в sqlite базе. Обращения к записям и новые схемы фиксируются порциями в flush,
+    при закрытии кэша вытесняются давно не использованные записи, пока размер не станет меньше лимита.
+    Соединение открывается лениво в каждом процессе, поэтому экземпляр можно передавать в пул процессов.
+
+    """
+
+    # Меняется при изменении алгоритма генерации схем, чтобы не использовать устаревшие записи
+    SCHEMA_CACHE_VERSION = 3
+
+    def __init__(self, path_to_cache: str, options: dict, max_size_mb: int = 512):
+        """Конструктор класса.
+
+        :param path_to_cache: Путь к файлу sqlite базы кэша.
+        :param options: Опции генерации JSON схемы, входят в ключ кэша.
+        :param max_size_mb: Максимальный суммарный размер схем в кэше в мегабайтах.
+
+        """
+        self.path_to_cache = path_to_cache
+        self.max_size = max_size_mb * 1024 * 1024
+        self._options_fingerprint = json.dumps(
+            {"version": self.SCHEMA_CACHE_VERSION, "options": options}, sort_keys=True).encode("utf-8")
+
+        self._connection = None
+        self._used_keys = set()
+        self._new_schemes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_used_keys"] = set()
+        state["_new_schemes"] = {}
+        return state
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Соединение с базой кэша, создаётся при первом обращении.
+
+        :return: Соединение sqlite.
+
+        """
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path_to_cache)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path_to_cache, timeout=60)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS schemes "
+                "(key TEXT PRIMARY KEY, schema TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL, "
+                "skipped_array_items INTEGER NOT NULL DEFAULT 0)")
+            # Кэш, созданный до появления столбца, дополняется им. Его записи не используются из-за версии в ключе
+            columns = [row[1] for row in self._connection.execute("PRAGMA table_info(schemes)")]
+            if "skipped_array_items" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE schemes ADD COLUMN skipped_array_items INTEGER NOT NULL DEFAULT 0")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS schemes_last_used ON schemes (last_used)")
+            self._connection.commit()
+        return self._connection
+
+    def make_key(self, payload_type: str, payload: Any) -> str:
+        """Вычисление ключа кэша для полезной нагрузки.
+
+        Строки и байты хэшируются как есть, без декодирования, декодированные объекты - после сериализации.
+
+        :param payload_type: Тип данных кадра.
+        :param payload: Полезная нагрузка кадра.
+        :return: Ключ кэша.
+
+        """
+        if isinstance(payload, str):
+            payload_bytes = payload.encode("utf-8", "surrogatepass")
+        elif isinstance(payload, bytes):
+            payload_bytes = payload
+        else:
+            payload_bytes = JSONCodec.dumps(payload, ensure_ascii=False).encode("utf-8", "surrogatepass")
+
+        key_hash = hashlib.blake2b(self._options_fingerprint, digest_size=20)
+        key_hash.update(payload_type.encode("utf-8"))
+        key_hash.update(b"\0")
+        key_hash.update(payload_bytes)
+
+        return key_hash.hexdigest()
+
+    def get(self, key: str) -> Optional[tuple[dict, int]]:
+        """Получение схемы из кэша.
+
+        :param key: Ключ кэша.
+        :return: Схема и количество элементов массивов, пропущенных при её генерации, или None,
+            если схемы нет в кэше.
+
+        """
+        if key in self._new_schemes:
+            row = self._new_schemes[key]
+        else:
+            row = self.connection.execute("SELECT schema, skipped_array_items FROM schemes WHERE key = ?",
+                                          (key,)).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._used_keys.add(key)
+        schema_json, skipped_array_items = row
+        return JSONCodec.loads(schema_json), skipped_array_items
+
+    def put(self, key: str, schema: dict, skipped_array_items: int = 0):
+        """Добавление схемы в кэш. Запись в базу выполняется в flush.
+
+        :param key: Ключ кэша.
+        :param schema: JSON схема.
+        :param skipped_array_items: Количество элементов массивов, пропущенных при генерации схемы выборкой.
+
+        """
+        self._new_schemes[key] = (JSONCodec.dumps(schema), skipped_array_items)
+
+        if len(self._new_schemes) >= 1000:
+            self.flush()
+
+    def flush(self):
+        """Запись новых схем и времени обращения к записям в базу одной транзакцией."""
+        if not self._new_schemes and not self._used_keys:
+            return
+
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO schemes (key, schema, size, last_used, skipped_array_items) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((key, schema_json, len(schema_json), now, skipped_array_items)
+                 for key, (schema_json, skipped_array_items) in self._new_schemes.items()))
+            self.connection.executemany(
+                "UPDATE schemes SET last_used = ? WHERE key = ?",
+                ((now, key) for key in self._used_keys))
+
+        self._new_schemes.clear()
+        self._used_keys.clear()
+
+    def evict(self):
+        """Вытеснение давно не использованных записей, пока размер кэша больше лимита."""
+        total_size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM schemes").fetchone()[0]
+        excess_size = total_size - self.max_size
+        if excess_size <= 0:
+            return
+
+        evicted_keys = []
+        for key, size in self.connection.execute("SELECT key, size FROM schemes ORDER BY last_used"):
+            evicted_keys.append((key,))
+            excess_size -= size
+            if excess_size <= 0:
+                break
+
+        with self.connection:
+            self.connection.executemany("DELETE FROM schemes WHERE key = ?", evicted_keys)
+
+        logger.info(f"Из кэша схем вытеснено записей: {len(evicted_keys)}")
+
+    def close(self):
+        """Запись изменений, вытеснение лишних записей и закрытие соединения."""
+        self.flush()
+        self.evict()
+
+        if self.hits or self.misses:
+            logger.info(f"Кэш схем: попаданий {self.hits}, промахов {self.misses}")
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
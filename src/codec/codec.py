@@ -0,0 +1,393 @@
+import json
+import re
+from itertools import repeat
+from json.decoder import WHITESPACE, scanstring
+from json.encoder import encode_basestring, encode_basestring_ascii
+from json.scanner import NUMBER_RE
+from typing import Any, TextIO
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+# Базовый класс ошибок декодирования для всех кодеков
+JSONDecodeError = ValueError
+
+
+class JSONCodec:
+    """Единая точка сериализации и десериализации JSON.
+
+    Кодек выбирается один раз через `JSONCodec.use`: "orjson", "ujson", "json" или "auto" (самый быстрый из
+    установленных). Если нативный кодек не может обработать значение (например, целое больше 64 бит или
+    нестроковые ключи), используется стандартный json.
+
+    Нативные кодеки пишут JSON без пробелов после разделителей и без экранирования не-ASCII символов,
+    а orjson поддерживает только отступ в 2 пробела, для других отступов используется стандартный json.
+    orjson декодирует целые больше 64 бит как float, поэтому документы с такими числами декодируются стандартным json,
+    а NaN и Infinity записывает как null, поэтому значения с ними сериализуются стандартным json.
+    Строки с одиночными суррогатами нативные кодеки не записывают или записывают без экранирования,
+    такие значения тоже сериализуются стандартным json.
+    Стандартный json обходит значения рекурсивно, поэтому значения глубже предела рекурсии сериализуются
+    и десериализуются с явным стеком.
+
+    """
+
+    AVAILABLE_CODECS = ["json"] + (["ujson"] if ujson else []) + (["orjson"] if orjson else [])
+
+    # Цифры заменяются на "0", остальные байты на пробел: длинное число становится подстрокой из нулей
+    _DIGITS_TABLE = bytes(0x30 if 0x30 <= byte <= 0x39 else 0x20 for byte in range(256))
+    # Целое больше 64 бит содержит не меньше 20 цифр подряд
+    _LONG_DIGITS = b"0" * 20
+    # Одиночные суррогаты, которые ujson может записать без экранирования
+    _SURROGATES = re.compile("[\ud800-\udfff]")
+    # Литералы JSON, включая допускаемые стандартным json NaN и Infinity
+    _CONSTANTS = {"null": None, "true": True, "false": False,
+                  "NaN": float("nan"), "Infinity": float("inf"), "-Infinity": float("-inf")}
+
+    name = "json"
+
+    @classmethod
+    def use(cls, name: str = "auto") -> str:
+        """Выбор кодека.
+
+        :param name: Наименование кодека: "auto", "orjson", "ujson" или "json".
+        :return: Наименование выбранного кодека.
+
+        """
+        if name == "auto":
+            name = cls.AVAILABLE_CODECS[-1]
+        elif name not in cls.AVAILABLE_CODECS:
+            raise ValueError(f"JSON кодек {name} не установлен. Доступные кодеки: {cls.AVAILABLE_CODECS}")
+
+        if name != cls.name:
+            # loguru нужен только для этого сообщения и заметно замедляет импорт кодека, поэтому импортируется здесь
+            from loguru import logger
+
+            logger.debug(f"Выбран JSON кодек: {name}")
+        cls.name = name
+
+        return name
+
+    @classmethod
+    def _has_long_digits(cls, data: str | bytes) -> bool:
+        """Проверка, есть ли в JSON последовательность цифр, которая может быть целым больше 64 бит.
+
+        Цифры в строках и дробных числах тоже учитываются: для них стандартный json даёт тот же результат.
+
+        :param data: Строка или байты JSON.
+        :return: True, если в JSON есть 20 и более цифр подряд.
+
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8", "surrogatepass")
+        return cls._LONG_DIGITS in data.translate(cls._DIGITS_TABLE)
+
+    @classmethod
+    def loads(cls, data: str | bytes) -> Any:
+        """Десериализация JSON.
+
+        :param data: Строка или байты JSON.
+        :return: Декодированный объект.
+
+        """
+        # orjson не сохраняет точность целых больше 64 бит, такие документы декодирует стандартный json
+        if cls.name == "orjson" and not cls._has_long_digits(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        elif cls.name == "ujson":
+            try:
+                return ujson.loads(data)
+            except (ValueError, OverflowError):
+                pass
+
+        # Стандартный json и повторная попытка для значений, которые не разобрал нативный кодек
+        try:
+            return json.loads(data)
+        except RecursionError:
+            return cls._loads_iterative(data)
+
+    @classmethod
+    def dumps(cls, obj: Any, ensure_ascii: bool = True, indent: int | None = None) -> str:
+        """Сериализация в строку JSON.
+
+        :param obj: Объект для сериализации.
+        :param ensure_ascii: Экранировать не-ASCII символы (только для стандартного json).
+        :param indent: Отступ для форматирования.
+        :return: Строка JSON.
+
+        """
+        if cls.name == "orjson" and indent in (None, 2):
+            try:
+                data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+            except TypeError:
+                pass
+            else:
+                # orjson записывает NaN и Infinity как null, такие значения сериализует стандартный json
+                if b"null" not in data or not cls._has_non_finite_floats(obj):
+                    return data.decode("utf-8")
+        elif cls.name == "ujson":
+            try:
+                data = ujson.dumps(obj, ensure_ascii=False, indent=indent or 0, escape_forward_slashes=False)
+            except (TypeError, ValueError, OverflowError):
+                # ValueError включает UnicodeEncodeError, которую старые версии ujson выбрасывают
+                # для строк с одиночными суррогатами
+                pass
+            else:
+                # Новые версии ujson записывают одиночные суррогаты без экранирования, такая строка не кодируется
+                # в UTF-8. Если нужно экранирование, её сериализует стандартный json
+                if not ensure_ascii or not cls._SURROGATES.search(data):
+                    return data
+
+        try:
+            return json.dumps(obj, ensure_ascii=ensure_ascii, indent=indent)
+        except RecursionError:
+            return cls._dumps_iterative(obj, ensure_ascii=ensure_ascii, indent=indent)
+
+    @staticmethod
+    def _has_non_finite_floats(obj: Any) -> bool:
+        """Проверка, есть ли в значении NaN или Infinity.
+
+        :param obj: Объект для сериализации.
+        :return: True, если среди вложенных значений есть NaN, Infinity или -Infinity.
+
+        """
+        stack = [obj]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, dict):
+                stack.extend(value.values())
+            elif isinstance(value, (list, tuple)):
+                stack.extend(value)
+            elif isinstance(value, float) and value - value != 0:
+                return True
+        return False
+
+    @staticmethod
+    def _scan_key(data: str, idx: int) -> tuple[str, int]:
+        """Разбор ключа объекта вместе с двоеточием после него.
+
+        :param data: Строка JSON.
+        :param idx: Позиция открывающей кавычки ключа.
+        :return: Ключ и позиция значения после пробельных символов.
+
+        """
+        if data[idx:idx + 1] != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", data, idx)
+        key, idx = scanstring(data, idx + 1)
+
+        idx = WHITESPACE.match(data, idx).end()
+        if data[idx:idx + 1] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", data, idx)
+        return key, WHITESPACE.match(data, idx + 1).end()
+
+    @classmethod
+    def _loads_iterative(cls, data: str | bytes) -> Any:
+        """Десериализация JSON с явным стеком вместо рекурсии.
+
+        Результат совпадает со стандартным json, используется для документов глубже предела рекурсии.
+
+        :param data: Строка или байты JSON.
+        :return: Декодированный объект.
+
+        """
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode(json.detect_encoding(data), "surrogatepass")
+        match_whitespace = WHITESPACE.match
+
+        # Элемент стека: незавершённый объект или массив и ключ следующего значения объекта
+        stack = []
+        idx = match_whitespace(data, 0).end()
+
+        while True:
+            char = data[idx:idx + 1]
+            if char == "{":
+                idx = match_whitespace(data, idx + 1).end()
+                if data[idx:idx + 1] != "}":
+                    key, idx = cls._scan_key(data, idx)
+                    stack.append(({}, key))
+                    continue
+                value = {}
+                idx += 1
+            elif char == "[":
+                idx = match_whitespace(data, idx + 1).end()
+                if data[idx:idx + 1] != "]":
+                    stack.append(([], None))
+                    continue
+                value = []
+                idx += 1
+            elif char == '"':
+                value, idx = scanstring(data, idx + 1)
+            else:
+                match = NUMBER_RE.match(data, idx)
+                if match is not None:
+                    integer, fraction, exponent = match.groups()
+                    if fraction or exponent:
+                        value = float(integer + (fraction or "") + (exponent or ""))
+                    else:
+                        value = int(integer)
+                    idx = match.end()
+                else:
+                    for constant, constant_value in cls._CONSTANTS.items():
+                        if data.startswith(constant, idx):
+                            value = constant_value
+                            idx += len(constant)
+                            break
+                    else:
+                        raise json.JSONDecodeError("Expecting value", data, idx)
+
+            # Значение разобрано: добавление в контейнер и закрытие завершённых контейнеров
+            while True:
+                idx = match_whitespace(data, idx).end()
+                if not stack:
+                    if idx != len(data):
+                        raise json.JSONDecodeError("Extra data", data, idx)
+                    return value
+
+                container, key = stack[-1]
+                if key is None:
+                    container.append(value)
+                else:
+                    container[key] = value
+
+                char = data[idx:idx + 1]
+                if char == ",":
+                    idx = match_whitespace(data, idx + 1).end()
+                    if key is not None:
+                        key, idx = cls._scan_key(data, idx)
+                        stack[-1] = (container, key)
+                    break
+
+                if char != ("]" if key is None else "}"):
+                    raise json.JSONDecodeError("Expecting ',' delimiter", data, idx)
+                stack.pop()
+                value = container
+                idx += 1
+
+    @staticmethod
+    def _encode_float(value: float) -> str:
+        """Сериализация числа с плавающей точкой так же, как в стандартном json.
+
+        :param value: Число.
+        :return: Строка JSON.
+
+        """
+        if value != value:
+            return "NaN"
+        if value == float("inf"):
+            return "Infinity"
+        if value == float("-inf"):
+            return "-Infinity"
+        return float.__repr__(value)
+
+    @classmethod
+    def _encode_key(cls, key: Any) -> str:
+        """Приведение ключа объекта к строке так же, как в стандартном json.
+
+        :param key: Ключ словаря.
+        :return: Ключ в виде строки.
+
+        """
+        if isinstance(key, str):
+            return key
+        if key is True:
+            return "true"
+        if key is False:
+            return "false"
+        if key is None:
+            return "null"
+        if isinstance(key, int):
+            return int.__repr__(key)
+        if isinstance(key, float):
+            return cls._encode_float(key)
+        raise TypeError(f"keys must be str, int, float, bool or None, not {key.__class__.__name__}")
+
+    @classmethod
+    def _dumps_iterative(cls, obj: Any, ensure_ascii: bool = True, indent: int | str | None = None) -> str:
+        """Сериализация в строку JSON с явным стеком вместо рекурсии.
+
+        Результат совпадает со стандартным json, используется для значений глубже предела рекурсии.
+
+        :param obj: Объект для сериализации.
+        :param ensure_ascii: Экранировать не-ASCII символы.
+        :param indent: Отступ для форматирования.
+        :return: Строка JSON.
+
+        """
+        encode_string = encode_basestring_ascii if ensure_ascii else encode_basestring
+        if isinstance(indent, int):
+            indent = " " * indent
+
+        chunks = []
+        # Элемент стека: значение и его уровень вложенности или готовый фрагмент строки и None
+        stack = [(obj, 0)]
+
+        while stack:
+            value, level = stack.pop()
+            if level is None or value is None:
+                chunks.append(value if level is None else "null")
+            elif isinstance(value, str):
+                chunks.append(encode_string(value))
+            elif value is True or value is False:
+                chunks.append("true" if value else "false")
+            elif isinstance(value, int):
+                chunks.append(int.__repr__(value))
+            elif isinstance(value, float):
+                chunks.append(cls._encode_float(value))
+            elif isinstance(value, (dict, list, tuple)):
+                is_dict = isinstance(value, dict)
+                if not value:
+                    chunks.append("{}" if is_dict else "[]")
+                    continue
+
+                if indent is None:
+                    separator, closing = ", ", "}" if is_dict else "]"
+                    chunks.append("{" if is_dict else "[")
+                else:
+                    newline = "\n" + indent * (level + 1)
+                    separator, closing = "," + newline, "\n" + indent * level + ("}" if is_dict else "]")
+                    chunks.append(("{" if is_dict else "[") + newline)
+
+                # Фрагменты содержимого кладутся в стек в обратном порядке
+                items = [(closing, None)]
+                for key, item in reversed(value.items()) if is_dict else zip(repeat(None), reversed(value)):
+                    if len(items) > 1:
+                        items.append((separator, None))
+                    items.append((item, level + 1))
+                    if is_dict:
+                        items.append((encode_string(cls._encode_key(key)) + ": ", None))
+                stack.extend(items)
+            else:
+                raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+        return "".join(chunks)
+
+    @classmethod
+    def load(cls, file: TextIO) -> Any:
+        """Десериализация JSON из файла.
+
+        :param file: Открытый в текстовом режиме файл.
+        :return: Декодированный объект.
+
+        """
+        return cls.loads(file.read())
+
+    @classmethod
+    def dump(cls, obj: Any, file: TextIO, ensure_ascii: bool = True, indent: int | None = None):
+        """Сериализация JSON в файл.
+
+        :param obj: Объект для сериализации.
+        :param file: Открытый в текстовом режиме файл. Для нативных кодеков должен быть в кодировке UTF-8.
+        :param ensure_ascii: Экранировать не-ASCII символы (только для стандартного json).
+        :param indent: Отступ для форматирования.
+
+        """
+        file.write(cls.dumps(obj, ensure_ascii=ensure_ascii, indent=indent))
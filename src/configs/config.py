@@ -1,47 +1,110 @@
-from dotenv import load_dotenv
-import os
 import configparser
 import json
+import os
+from functools import lru_cache
 
 """Описание объектов в config.json:
 
 VARIABLES: параметры для парсинга .har файлов и создания json схем.
 content_types: Типы контента HTTP для которых будет собрана полезная нагрузка для создания схем.
+skip_methods: Методы запросов, записи с которыми в .har файлах пропускаются, например ["options"].
+max_retries: Количество попыток запроса к API.
+api_max_workers: Количество потоков для одновременного сбора ответов API.
+api_max_connections_per_host: Максимальное количество одновременных запросов и соединений к одному хосту.
+api_backoff_base_seconds, api_backoff_max_seconds: Базовая и максимальная задержка перед повтором запроса,
+задержка растёт экспоненциально со случайным разбросом.
+api_timeout_seconds: Таймаут запроса к API.
+api_stream_responses: Сохранять ответы API как есть, блоками, без декодирования и переформатирования с indent=4.
+api_stream_chunk_size: Размер блока в байтах при сохранении ответов API.
+api_pipeline_queue_size: Максимальное количество ответов API в очереди на генерацию схем при запуске с --direct.
+api_pipeline_dump_responses: Сохранять ответы API в API_FILES_DIR при запуске с --direct.
+json_codec: JSON кодек для чтения и записи файлов: auto (самый быстрый из установленных), orjson, ujson или json.
+schemes_cache_max_size_mb: Максимальный размер кэша схем в мегабайтах.
+path_rewriter_cache_size: Количество путей запросов, для которых запоминаются результаты замены REPLACE_PATTERNS.
+schemes_writer_workers: Количество потоков для записи файлов схем.
+run_report_trace_memory: Замерять пиковую память этапов через tracemalloc в отчёте о запуске. Замедляет генерацию.
+run_report_profile_stage: Этап, выполнение которого профилируется cProfile, например "get_frames".
+Профиль сохраняется рядом с отчётом о запуске.
 json_schema_options: Опции для атрибутов JSON схем, ограничения для разных типов данных по требованиями УЭК АПТБ.
+arraySampling: Выборка элементов массивов для генерации схемы: all - все элементы, first - первые arraySampleSize,
+reservoir - случайные arraySampleSize с зерном arraySampleSeed, converge - пока arrayConvergeAfter подряд идущих
+элементов не перестанут изменять схему.
 
 REPLACE_PATTERNS: паттерны замен.
 url: Замена UUID, переменных, прокси.
 api_path: Замена UUID в пути к json схеме сервиса, токена переменной, прокси пути.
 
-SKIP_FRAMES_LIST: Список методов для которых схемы собираться не будут.
+SCHEMES_CACHE_PATH: Путь к sqlite базе кэша схем. Кэш не используется, если путь не задан.
+BUILD_MANIFEST_PATH: Путь к манифесту инкрементальной сборки схем.
+SCHEMES_INDEX_PATH: Путь к индексу хэшей записанных схем. Файлы схем, содержимое которых не изменилось,
+не перезаписываются. Если путь не задан, сравнивается содержимое файлов на диске.
+RUN_REPORT_PATH: Путь к JSON отчёту о запуске: время и память по этапам, файлам дампов и эндпоинтам.
+Отчёт не создаётся, если путь не задан.
+
+SKIP_FRAMES_LIST: Список кадров, для которых схемы собираться не будут. Записи и файлы дампов этих кадров
+пропускаются при чтении. Наименование кадра - тип ресурса (fetch для xhr) и базовый путь к схеме через "_".
 Например, SKIP_FRAMES_LIST = [
                "fetch__qs_path_api_odag_v1_openapi",
                "fetch__qs_path_api_dataprepservice_v1_openapi",
                "xhr__qs_path_api_hub_v1_streams"]
 
-QUERY_PARAMS_WEATHER: Строковые параметры для weather.
-
-ENDPOINTS: список эндпоинтов для APIHandler
+ENDPOINTS: список эндпоинтов для APIHandler.
+name: Наименование эндпоинта, ответы сохраняются в API_FILES_DIR/name/.
+url: Шаблон url, {base_url} заменяется на URL из .env.
+method: Тип запроса get или post.
+api_key_param: Строковый параметр, в который подставляется API_KEY из .env.
+query_params, payload: Общие строковые параметры и тело запроса для всех вариантов.
+variants: Список вариантов запроса с полями file_name, query_params, payload.
+variants_matrix: Значения query_params или payload, все комбинации которых добавляются в варианты.
 
 """
 
-config_ini = configparser.ConfigParser()
-load_dotenv()
+config_json_path = os.path.join(os.path.dirname(__file__), "config.json")
 
-config_ini.add_section("URL")
-config_ini.add_section("API_KEY")
 
-config_ini.set("URL", "weather", f"{os.getenv('URL')}weather")
+@lru_cache(maxsize=None)
+def get_config_json() -> dict:
+    """Чтение config.json. Файл читается один раз, при первом вызове.
 
-config_ini.set("API_KEY", "api_key", f"{os.getenv('API_KEY')}")
+    :return: Конфигурация из config.json.
+
+    """
+    with open(config_json_path, encoding="UTF-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def get_config_ini() -> configparser.ConfigParser:
+    """Получение URL и API_KEY из .env. Переменные окружения читаются один раз, при первом вызове,
+    файл config.ini не создаётся.
+
+    :return: Конфигурация с секциями URL и API_KEY.
+
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    config_ini = configparser.ConfigParser()
+    config_ini.add_section("URL")
+    config_ini.add_section("API_KEY")
+
+    config_ini.set("URL", "base_url", f"{os.getenv('URL')}")
+
+    config_ini.set("API_KEY", "api_key", f"{os.getenv('API_KEY')}")
+
+    return config_ini
 
-config_json_path = os.path.join(os.path.dirname(__file__), "config.json")
-config_ini_path = os.path.join(os.path.dirname(__file__), "config.ini")
 
-with open(config_json_path, encoding="UTF-8") as f:
-    config_json = json.load(f)
+def __getattr__(name: str):
+    """Ленивое получение config_json и config_ini: импорт модуля не читает файлы и переменные окружения.
 
-with open(config_ini_path, 'w') as config_file:
-    config_ini.write(config_file)
+    :param name: Наименование атрибута модуля.
+    :return: Конфигурация.
 
-config_ini.read(config_ini_path)
+    """
+    if name == "config_json":
+        return get_config_json()
+    if name == "config_ini":
+        return get_config_ini()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
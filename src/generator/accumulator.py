@@ -0,0 +1,227 @@
+import random
+from itertools import repeat
+from typing import Any
+
+from src.schema_types.schema_types import Type, ObjectType, ArrayType, NullType, StringType, NumberType, IntegerType, \
+    SCHEMA_TYPES
+from src.generator.schema_options import SchemaOptions
+
+
+class SchemaAccumulator(object):
+    """Накопитель JSON-схемы, поглощающий значения за один проход.
+
+    Каждый узел схемы - это словарь, который дополняется на месте при поглощении очередного значения
+    по правилам MergeJSONSchemes: типы объединяются без повторов, свойства объектов объединяются, maxLength
+    берётся наибольший, элементы массивов описываются по позициям (однородный массив - одним узлом items[0]).
+    Результат совпадает с генерацией схемы для каждого значения с последующим объединением схем,
+    но без создания промежуточной схемы на каждое значение.
+
+    Значение обходится в глубину с явным стеком, поэтому глубина вложенности не ограничена глубиной рекурсии.
+    Для больших массивов можно строить схему по выборке элементов (опция arraySampling),
+    количество пропущенных элементов доступно в skipped_array_items.
+
+    """
+
+    def __init__(self, options: dict | SchemaOptions = None, schema: dict = None):
+        """Конструктор класса.
+
+        :param options: Параметры для настройки схемы в виде словаря или уже разобранные `SchemaOptions`.
+        :param schema: Словарь, в который накапливается схема. По умолчанию пустой.
+
+        """
+        self._options = SchemaOptions.from_options(options)
+        self._schema = schema if schema is not None else {}
+        self.skipped_array_items = 0
+
+    def absorb(self, value: Any) -> bool:
+        """Поглощение значения корневым узлом схемы.
+
+        :param value: Значение, описываемое схемой.
+        :return: True, если схема изменилась.
+
+        """
+        return self._walk(self._schema, value)
+
+    def to_dict(self) -> dict:
+        """Получение накопленной схемы.
+
+        :return: Словарь, представляющий собой JSON-схему.
+
+        """
+        return self._schema
+
+    @staticmethod
+    def _apply_fragment(schema: dict, fragment: dict) -> bool:
+        """Добавление в узел схемы постоянных ограничений типа.
+
+        Ограничения фрагмента добавляются вместе и не меняются, поэтому достаточно проверить первое из них.
+
+        :param schema: Узел схемы.
+        :param fragment: Фрагмент схемы из `SchemaOptions`.
+        :return: True, если ограничения были добавлены.
+
+        """
+        if not fragment or next(iter(fragment)) in schema:
+            return False
+        schema.update(fragment)
+        return True
+
+    def _sample_items(self, value: list, is_positional: bool = False) -> list:
+        """Выборка элементов массива для режимов first и reservoir.
+
+        :param value: Массив.
+        :param is_positional: Элементы описываются по позициям, поэтому берутся только первые элементы.
+        :return: Элементы, по которым строится схема, в исходном порядке.
+
+        """
+        options = self._options
+        if options.array_sampling not in ("first", "reservoir") or len(value) <= options.array_sample_size:
+            return value
+
+        self.skipped_array_items += len(value) - options.array_sample_size
+
+        if options.array_sampling == "first" or is_positional:
+            return value[:options.array_sample_size]
+
+        # Выборка зависит только от зерна и длины массива, поэтому повторяется от запуска к запуску
+        sample_indexes = random.Random(options.array_sample_seed).sample(range(len(value)),
+                                                                         options.array_sample_size)
+        return [value[idx] for idx in sorted(sample_indexes)]
+
+    def _next_converging(self, frame: list, element_changed: bool) -> tuple | None:
+        """Получение следующего элемента однородного массива в режиме converge.
+
+        Элементы поглощаются до тех пор, пока они изменяют схему. Кадр стека массива:
+        [узел элементов, массив, индекс следующего элемента, элементов подряд без изменений, изменилась ли схема].
+
+        :param frame: Кадр стека массива, изменяется на месте.
+        :param element_changed: Изменил ли схему предыдущий элемент массива.
+        :return: Пара (узел схемы, элемент) или None, если элементы массива больше не поглощаются.
+
+        """
+        items_schema, value, idx, unchanged_count, _ = frame
+        if idx > 0:
+            if element_changed:
+                frame[4] = True
+                unchanged_count = 0
+            else:
+                unchanged_count += 1
+                if unchanged_count >= self._options.array_converge_after:
+                    self.skipped_array_items += len(value) - idx
+                    return None
+
+        if idx >= len(value):
+            return None
+        frame[2] = idx + 1
+        frame[3] = unchanged_count
+        return items_schema, value[idx]
+
+    def _walk(self, root_schema: dict, root_value: Any) -> bool:
+        """Дополнение узла схемы на месте описанием значения.
+
+        Узлы обходятся в прямом порядке, как при рекурсивном обходе: для каждого узла в стек кладётся итератор
+        пар (узел схемы, значение) его потомков.
+
+        :param root_schema: Узел схемы.
+        :param root_value: Значение, описываемое узлом.
+        :return: True, если узел или его потомки изменились.
+
+        """
+        options = self._options
+        schema_types = SCHEMA_TYPES
+        changed = False
+
+        # Элемент стека: итератор пар (узел схемы, значение) или кадр массива в режиме converge
+        stack = [iter(((root_schema, root_value),))]
+
+        while stack:
+            frame = stack[-1]
+            if type(frame) is list:
+                # Элемент массива обойдён целиком: changed показывает, изменил ли он схему
+                node = self._next_converging(frame=frame, element_changed=changed)
+                if node is None:
+                    stack.pop()
+                    changed = frame[4]
+                    continue
+                changed = False
+            else:
+                node = next(frame, None)
+                if node is None:
+                    stack.pop()
+                    continue
+
+            schema, value = node
+            schema_type = schema_types.get(type(value))
+            if schema_type is None:
+                schema_type = Type.get_schema_type_for(type(value))
+
+            if schema_type is StringType:
+                max_length = options.get_string_max_length(len(value))
+                if max_length is not None:
+                    current_max_length = schema.get("maxLength")
+                    if current_max_length is None or current_max_length < max_length:
+                        schema["maxLength"] = max_length
+                        changed = True
+
+                changed |= self._apply_fragment(schema, options.string_fragment)
+
+            elif schema_type is IntegerType or schema_type is NumberType:
+                changed |= self._apply_fragment(schema, options.number_fragment)
+
+            types = schema.get("type")
+            if types is None:
+                types = schema["type"] = []
+            if schema_type.json_type not in types:
+                types.append(schema_type.json_type)
+                changed = True
+            if schema_type is not NullType and NullType.json_type not in types:
+                types.append(NullType.json_type)
+                changed = True
+
+            if schema_type is ObjectType:
+                properties = schema.get("properties")
+                if properties is None:
+                    properties = schema["properties"] = {}
+                    changed = True
+                changed |= self._apply_fragment(schema, options.object_fragment)
+
+                if value:
+                    properties_nodes = []
+                    for prop, prop_value in value.items():
+                        prop_schema = properties.get(prop)
+                        if prop_schema is None:
+                            prop_schema = properties[prop] = {}
+                            changed = True
+                        properties_nodes.append((prop_schema, prop_value))
+                    stack.append(iter(properties_nodes))
+
+            elif schema_type is ArrayType and len(value) > 0:
+                changed |= self._apply_fragment(schema, options.array_fragment)
+
+                if options.enable_array:
+                    items = schema.get("items")
+                    if items is None:
+                        items = schema["items"] = []
+                    first_item_type = type(value[0])
+
+                    if all(type(item) is first_item_type for item in value):
+                        # Однородный массив описывается одним узлом, поглощающим все элементы
+                        if not items:
+                            items.append({})
+                            changed = True
+                        items_schema = items[0]
+
+                        if options.array_sampling == "converge":
+                            # Изменения до массива сохраняются в кадре, changed отражает только текущий элемент
+                            stack.append([items_schema, value, 0, 0, changed])
+                        else:
+                            stack.append(zip(repeat(items_schema), self._sample_items(value)))
+                    else:
+                        # Элементы разнородного массива описываются по позициям
+                        sampled_items = self._sample_items(value, is_positional=True)
+                        while len(items) < len(sampled_items):
+                            items.append({})
+                            changed = True
+                        stack.append(zip(items, sampled_items))
+
+        return changed
@@ -0,0 +1,159 @@
+import sys
+from typing import Any
+
+
+class SchemaInterner(object):
+    """Хранилище канонических узлов JSON-схем (hash-consing).
+
+    Структурно одинаковые поддеревья схем заменяются одним общим узлом. Отпечаток узла - упорядоченный кортеж
+    ключей и ссылок на канонические дочерние узлы, поэтому он строится снизу вверх за линейное время,
+    а сравнение одинаковых поддеревьев при объединении сводится к сравнению ссылок.
+
+    Канонические узлы общие и не должны изменяться на месте: перед изменением их нужно копировать (см. is_interned).
+    Узлы, на которые больше никто не ссылается, удаляются из хранилища в prune.
+
+    """
+
+    # Размер хранилища, до которого prune не выполняет обход
+    MIN_PRUNE_SIZE = 4096
+    # prune определяет неиспользуемые узлы по счётчику ссылок, который есть только в CPython
+    IS_PRUNE_SUPPORTED = sys.implementation.name == "cpython"
+
+    def __init__(self):
+        """Конструктор класса."""
+        self._canonical_nodes = {}
+        self._interned_ids = set()
+        self._prune_at = self.MIN_PRUNE_SIZE
+
+    def __len__(self) -> int:
+        """Количество канонических узлов.
+
+        :return: Количество узлов.
+
+        """
+        return len(self._canonical_nodes)
+
+    def __getstate__(self) -> dict:
+        """Состояние для передачи в процесс пула без накопленных узлов.
+
+        Идентичность узлов не сохраняется при передаче между процессами, поэтому результаты процессов
+        интернируются заново.
+
+        :return: Состояние объекта.
+
+        """
+        return {"_canonical_nodes": {}, "_interned_ids": set(), "_prune_at": self.MIN_PRUNE_SIZE}
+
+    def is_interned(self, node: Any) -> bool:
+        """Проверка, является ли узел каноническим (общим).
+
+        :param node: Узел схемы.
+        :return: True, если узел общий и его нельзя изменять на месте.
+
+        """
+        return id(node) in self._interned_ids
+
+    def _get_fingerprint_item(self, value: Any, canonical_by_id: dict) -> tuple:
+        """Элемент отпечатка для значения узла.
+
+        :param value: Значение в словаре или списке схемы.
+        :param canonical_by_id: Канонические узлы для уже обработанных дочерних узлов.
+        :return: Ссылка на канонический узел или значение вместе с типом, чтобы 1, 1.0 и True различались.
+
+        """
+        if isinstance(value, (dict, list)):
+            if id(value) not in self._interned_ids:
+                value = canonical_by_id[id(value)]
+            return None, id(value)
+        return type(value), value
+
+    def _canonicalize(self, node: dict | list, canonical_by_id: dict) -> dict | list:
+        """Получение канонического узла для узла, все дочерние узлы которого уже обработаны.
+
+        :param node: Узел схемы.
+        :param canonical_by_id: Канонические узлы для уже обработанных дочерних узлов.
+        :return: Канонический узел.
+
+        """
+        if isinstance(node, dict):
+            fingerprint = (dict, tuple((key, self._get_fingerprint_item(value, canonical_by_id))
+                                       for key, value in node.items()))
+        else:
+            fingerprint = (list, tuple(self._get_fingerprint_item(value, canonical_by_id) for value in node))
+
+        canonical_node = self._canonical_nodes.get(fingerprint)
+        if canonical_node is not None:
+            return canonical_node
+
+        # Узел становится каноническим, его дочерние узлы заменяются каноническими
+        children = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in children:
+            if isinstance(value, (dict, list)) and id(value) not in self._interned_ids:
+                node[key] = canonical_by_id[id(value)]
+
+        self._canonical_nodes[fingerprint] = node
+        self._interned_ids.add(id(node))
+        return node
+
+    def intern(self, schema: Any) -> Any:
+        """Замена поддеревьев схемы каноническими узлами.
+
+        Схема может изменяться на месте, поэтому передаваться должна схема, которой владеет вызывающий код.
+
+        :param schema: Схема или её узел.
+        :return: Канонический узел схемы.
+
+        """
+        if not isinstance(schema, (dict, list)) or id(schema) in self._interned_ids:
+            return schema
+
+        canonical_by_id = {}
+        # Обход в обратном порядке: узел обрабатывается после всех своих потомков
+        stack = [(schema, False)]
+        while stack:
+            node, is_expanded = stack.pop()
+            if is_expanded:
+                canonical_by_id[id(node)] = self._canonicalize(node, canonical_by_id)
+                continue
+
+            stack.append((node, True))
+            for value in (node.values() if isinstance(node, dict) else node):
+                if isinstance(value, (dict, list)) and id(value) not in self._interned_ids \
+                        and id(value) not in canonical_by_id:
+                    stack.append((value, False))
+
+        return canonical_by_id[id(schema)]
+
+    def prune(self):
+        """Удаление из хранилища канонических узлов, на которые ссылается только само хранилище.
+
+        Такие узлы остаются от схем, уже объединённых в накопленные: без удаления хранилище удерживало бы каждое
+        поддерево каждой схемы до конца генерации. Обход выполняется, только когда хранилище выросло вдвое
+        с предыдущего обхода, поэтому его стоимость в пересчёте на узел постоянна.
+
+        Вызывающий код не должен хранить канонические узлы вне словарей, списков и переменных, например только по id.
+        В реализациях Python без счётчика ссылок узлы не удаляются: хранилище растёт, но результат не меняется.
+
+        """
+        if not self.IS_PRUNE_SUPPORTED or len(self._canonical_nodes) < self._prune_at:
+            return
+
+        # Узел считается неиспользуемым по счётчику ссылок CPython: каждый владелец узла (словарь, список, переменная)
+        # держит на него ссылку. Узел нельзя удалить, пока на него ссылается кто-то кроме хранилища: иначе его id
+        # может достаться новому объекту, а сам общий узел будет изменён на месте как необщий.
+        # Сколько временных ссылок добавляют вызов sys.getrefcount и переменная цикла, зависит от версии
+        # интерпретатора, поэтому порог берётся с пробного узла, на который ссылаются только словарь и переменная
+        probe = {None: {}}
+        node = probe[None]
+        unreferenced_refcount = sys.getrefcount(node)
+
+        # Узел добавляется в хранилище после своих дочерних узлов, поэтому при обходе в обратном порядке
+        # родитель удаляется раньше дочерних узлов и освобождает ссылки на них
+        for fingerprint in reversed(list(self._canonical_nodes)):
+            node = self._canonical_nodes[fingerprint]
+            if sys.getrefcount(node) <= unreferenced_refcount:
+                del self._canonical_nodes[fingerprint]
+                self._interned_ids.discard(id(node))
+        node = None
+
+        self._prune_at = max(self.MIN_PRUNE_SIZE, 2 * len(self._canonical_nodes))
@@ -0,0 +1,123 @@
+from bisect import bisect_left
+
+# Версия JSON-схемы по умолчанию, если schemaVersion не задан
+DEFAULT_SCHEMA_VERSION = "http://json-schema.org/draft-04/schema#"
+
+
+class SchemaOptions(object):
+    """Параметры генерации схемы из json_schema_options, разобранные один раз.
+
+    Наличие каждой опции проверяется при создании объекта, а не в каждом узле схемы. Постоянные ограничения
+    каждого типа собраны в готовые фрагменты схемы, а maxLength строки ищется двоичным поиском.
+
+    """
+
+    __slots__ = ("schema_version", "string_max_lengths", "has_string_min_length", "string_min_length",
+                 "has_number_minimum", "number_minimum", "has_number_maximum", "number_maximum",
+                 "has_additional_properties", "additional_properties",
+                 "has_array_max_items", "array_max_items", "has_array_min_items", "array_min_items",
+                 "has_additional_items", "additional_items", "enable_array",
+                 "array_sampling", "array_sample_size", "array_sample_seed", "array_converge_after",
+                 "is_string_max_lengths_sorted", "string_fragment", "number_fragment", "object_fragment",
+                 "array_fragment")
+
+    def __init__(self, options: dict = None):
+        """Конструктор класса.
+
+        :param options: Параметры для настройки схемы.
+
+        """
+        if options is None:
+            options = {}
+
+        self.schema_version = options.get("schemaVersion", DEFAULT_SCHEMA_VERSION)
+        self.string_max_lengths = options.get("stringMaxLengths") if "stringMaxLengths" in options else None
+        self.has_string_min_length = "stringMinLength" in options
+        self.string_min_length = options.get("stringMinLength")
+
+        self.has_number_minimum = "numberMinimum" in options
+        self.number_minimum = options.get("numberMinimum")
+        self.has_number_maximum = "numberMaximum" in options
+        self.number_maximum = options.get("numberMaximum")
+
+        self.has_additional_properties = "additionalProperties" in options
+        self.additional_properties = options.get("additionalProperties")
+
+        self.has_array_max_items = "arrayMaxItems" in options
+        self.array_max_items = options.get("arrayMaxItems")
+        self.has_array_min_items = "arrayMinItems" in options
+        self.array_min_items = options.get("arrayMinItems")
+        self.has_additional_items = "additionalItems" in options
+        self.additional_items = options.get("additionalItems")
+        self.enable_array = bool(options.get("enableArray"))
+
+        # Выборка элементов массивов: all - все элементы, first - первые arraySampleSize,
+        # reservoir - случайные arraySampleSize с зерном arraySampleSeed,
+        # converge - до arrayConvergeAfter подряд идущих элементов, не изменивших схему
+        self.array_sampling = options.get("arraySampling", "all")
+        self.array_sample_size = options.get("arraySampleSize", 1000)
+        self.array_sample_seed = options.get("arraySampleSeed", 0)
+        self.array_converge_after = options.get("arrayConvergeAfter", 200)
+
+        if not self.string_max_lengths:
+            self.string_max_lengths = None
+        self.is_string_max_lengths_sorted = self.string_max_lengths is not None and all(
+            previous <= current for previous, current in zip(self.string_max_lengths, self.string_max_lengths[1:]))
+
+        # Фрагменты с постоянными ограничениями типов, в порядке ключей генерируемой схемы
+        self.string_fragment = {}
+        if self.has_string_min_length:
+            self.string_fragment["minLength"] = self.string_min_length
+
+        self.number_fragment = {}
+        if self.has_number_minimum:
+            self.number_fragment["minimum"] = self.number_minimum
+        if self.has_number_maximum:
+            self.number_fragment["maximum"] = self.number_maximum
+
+        self.object_fragment = {}
+        if self.has_additional_properties:
+            self.object_fragment["additionalProperties"] = self.additional_properties
+
+        self.array_fragment = {}
+        if self.has_array_max_items:
+            self.array_fragment["maxItems"] = self.array_max_items
+        if self.has_array_min_items:
+            self.array_fragment["minItems"] = self.array_min_items
+        if self.has_additional_items:
+            self.array_fragment["additionalItems"] = self.additional_items
+
+    def get_string_max_length(self, length: int) -> int | None:
+        """Получение maxLength для строки: последняя граница из stringMaxLengths, если строка длиннее её,
+        иначе первая граница, не меньшая длины строки.
+
+        :param length: Длина строки.
+        :return: maxLength или None, если stringMaxLengths не задан.
+
+        """
+        max_lengths = self.string_max_lengths
+        if max_lengths is None:
+            return None
+
+        if self.is_string_max_lengths_sorted:
+            idx = bisect_left(max_lengths, length)
+            return max_lengths[idx] if idx < len(max_lengths) else max_lengths[-1]
+
+        # Для неотсортированного списка сохраняется порядок поиска по списку
+        if length > max_lengths[-1]:
+            return max_lengths[-1]
+        for max_length in max_lengths:
+            if max_length >= length:
+                return max_length
+
+    @classmethod
+    def from_options(cls, options: "dict | SchemaOptions | None") -> "SchemaOptions":
+        """Получение разобранных параметров.
+
+        :param options: Параметры для настройки схемы в виде словаря или уже разобранные.
+        :return: Экземпляр класса `SchemaOptions`.
+
+        """
+        if isinstance(options, cls):
+            return options
+        return cls(options)
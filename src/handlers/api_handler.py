@@ -1,24 +1,101 @@
-import time
-import requests
+import itertools
 import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 import os
 from configparser import ConfigParser
-from typing import Optional, Any
-from requests import Response
-from urllib3.exceptions import InsecureRequestWarning
+from typing import Optional, Any, Callable, TYPE_CHECKING
+from urllib.parse import urlparse
+
+from src.codec.codec import JSONCodec
+from src.handlers.json_stream_reader import JSONStreamReader
+from src.handlers.response_stream import ResponseStream
+from src.report.run_report import RunReport
 
+if TYPE_CHECKING:
+    from requests import Response
 
-requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
 class APIHandler:
     """Класс для обработки API и сохранения ответов в виде json файлов"""
 
-    def __init__(self, config_json: dict, config_ini: ConfigParser):
+    def __init__(self,
+                 config_json: dict,
+                 config_ini: ConfigParser,
+                 response_handler: Optional[Callable[[str, str, Any], None]] = None,
+                 is_dump_responses: bool = True,
+                 run_report: Optional[RunReport] = None):
+        """Конструктор класса.
+
+        :param config_json: Конфигурация из config.json.
+        :param config_ini: Конфигурация из config.ini.
+        :param response_handler: Функция, которой передаётся каждый успешный ответ (эндпоинт, имя файла, декодированный ответ),
+        например для генерации схемы без повторного чтения файла.
+        :param is_dump_responses: Сохранять ответы в API_FILES_DIR.
+        :param run_report: Общий отчёт о запуске. По умолчанию отчёт создаётся по RUN_REPORT_PATH
+            и сохраняется в конце collect_responses.
+
+        """
         self._config_json = config_json
         self._config_ini = config_ini
         self._endpoints = self._config_json.get("ENDPOINTS")
-        self._max_retries = self._config_json.get("VARIABLES").get("max_retries")
+        self._response_handler = response_handler
+        self._is_dump_responses = is_dump_responses
+        self._is_run_report_owner = run_report is None
+        self._run_report = RunReport.from_config(config_json) if run_report is None else run_report
+
+        variables = self._config_json.get("VARIABLES")
+        self._max_retries = variables.get("max_retries")
+        self._max_workers = variables.get("api_max_workers", 8)
+        self._max_connections_per_host = variables.get("api_max_connections_per_host", 4)
+        self._backoff_base = variables.get("api_backoff_base_seconds", 1)
+        self._backoff_max = variables.get("api_backoff_max_seconds", 30)
+        self._timeout = variables.get("api_timeout_seconds", 60)
+        self._is_streaming = variables.get("api_stream_responses", False)
+        self._stream_chunk_size = variables.get("api_stream_chunk_size", 1 << 16)
+
+        # requests импортируется только при работе с API, а не при импорте модуля
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.exceptions import InsecureRequestWarning
+
+        requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+        self._request_exception = requests.RequestException
+
+        # Общая сессия с пулом соединений, соединения переиспользуются между запросами и потоками
+        self._session = requests.Session()
+        self._session.verify = False
+        adapter = HTTPAdapter(pool_connections=self._max_workers, pool_maxsize=self._max_connections_per_host)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._host_semaphores = {}
+        self._host_semaphores_lock = threading.Lock()
+
+    def _get_host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """Получение семафора, ограничивающего количество одновременных запросов к хосту.
+
+        :param url: url для запроса.
+        :return: Семафор хоста.
+
+        """
+        host = urlparse(url).netloc
+        with self._host_semaphores_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self._max_connections_per_host)
+            return self._host_semaphores[host]
+
+    def _get_backoff_delay(self, retries: int) -> float:
+        """Вычисление задержки перед повтором: экспоненциальный рост с полным случайным разбросом.
+
+        :param retries: Номер повтора, начиная с 0.
+        :return: Задержка в секундах.
+
+        """
+        return random.uniform(0, min(self._backoff_max, self._backoff_base * 2 ** retries))
 
     @staticmethod
     def _save_response_json_to_dir(data: dict, file_name: str, directory: str):
@@ -32,40 +109,98 @@ class APIHandler:
         os.makedirs(directory, exist_ok=True)
 
         with open(os.path.join(directory, file_name), 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+            JSONCodec.dump(data, f, ensure_ascii=False, indent=4)
+
+    @staticmethod
+    def _save_response_bytes_to_dir(content: bytes, file_name: str, directory: str):
+        """Сохраняет тело ответа от API в файл без изменений.
+
+        :param content: Тело ответа.
+        :param file_name: Имя файла для сохранения.
+        :param directory: Директория для сохранения файла.
+
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        with open(os.path.join(directory, file_name), 'wb') as f:
+            f.write(content)
+
+    def _stream_response_to_dir(self,
+                                response: "Response",
+                                file_name: str,
+                                directory: str) -> Optional[int]:
+        """Сохраняет тело ответа от API в файл блоками, проверяя по ходу чтения, что это корректный JSON.
+
+        Ответ не декодируется целиком и не переформатируется. Если ответ не является JSON или соединение
+        оборвалось при чтении тела, файл не создаётся. Ошибка соединения передаётся вызывающему коду для повтора запроса.
+
+        :param response: Ответ, полученный с stream=True.
+        :param file_name: Имя файла для сохранения.
+        :param directory: Директория для сохранения файла.
+        :return: Количество прочитанных байт тела ответа или None, если ответ не является корректным JSON.
+
+        """
+        os.makedirs(directory, exist_ok=True)
+        path_to_file = os.path.join(directory, file_name)
+        path_to_part = f"{path_to_file}.part"
+
+        try:
+            with open(path_to_part, 'wb') as f:
+                stream = ResponseStream(chunks=response.iter_content(chunk_size=self._stream_chunk_size), file=f)
+                JSONStreamReader(stream, chunk_size=self._stream_chunk_size).validate()
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Ответ для {path_to_file} не является корректным JSON: {e}")
+            os.remove(path_to_part)
+            return None
+        except self._request_exception:
+            os.remove(path_to_part)
+            raise
+        finally:
+            response.close()
+
+        os.replace(path_to_part, path_to_file)
+        return stream.bytes_read
 
     def _request_handler(self,
                          url: str,
                          method_type: str,
                          payload: Optional[dict] = None,
-                         query_params: Optional[dict] = None) -> Response | None | Any:
+                         query_params: Optional[dict] = None,
+                         stream: bool = False) -> "Response | None | Any":
         retries = 0
+        host_semaphore = self._get_host_semaphore(url=url)
 
         while retries < self._max_retries:
-            if method_type == "get":
-                request = requests.get(url=url,
-                                       params=query_params,
-                                       verify=False)
+            try:
+                with host_semaphore:
+                    if method_type == "get":
+                        request = self._session.get(url=url,
+                                                    params=query_params,
+                                                    timeout=self._timeout,
+                                                    stream=stream)
+                    elif method_type == "post":
+                        request = self._session.post(url=url,
+                                                     params=query_params,
+                                                     data=JSONCodec.dumps(payload),
+                                                     timeout=self._timeout,
+                                                     stream=stream)
+                    else:
+                        raise ValueError(f"Неподдерживаемый тип запроса {method_type}")
+            except self._request_exception as e:
+                status = f"Ошибка запроса {e.__class__.__name__}"
+            else:
                 if request.status_code == 200:
                     logger.info(f"Запрос выполнен успешно, код 200")
                     return request
-                else:
-                    logger.warning(f"Статус код {request.status_code}. Попытка {retries + 1} / {self._max_retries}. "
-                                   f"Повтор через 10 секунд...")
+                status = f"Статус код {request.status_code}"
+                request.close()
 
-            elif method_type == "post":
-                request = requests.post(url=url,
-                                        data=json.dumps(payload),
-                                        verify=False)
-                if request.status_code == 200:
-                    logger.info(f"Запрос выполнен успешно, код 200")
-                    return request
-                else:
-                    logger.warning(f"Статус код {request.status_code}. Попытка {retries + 1} / {self._max_retries}. "
-                                   f"Повтор через 10 секунд...")
+            delay = self._get_backoff_delay(retries=retries)
+            logger.warning(f"{status}. Попытка {retries + 1} / {self._max_retries}. "
+                           f"Повтор через {delay:.1f} секунд...")
 
             retries += 1
-            time.sleep(10)
+            time.sleep(delay)
 
         logger.error(f"Максимальное количество повторов ({self._max_retries}) достигнуто. Запрос не выполнен.")
 
@@ -83,38 +218,166 @@ class APIHandler:
         :param endpoint: эндпоинт для запроса.
         :param file_name: наименование файла, в который будет сохранен респонс.
         :param payload: Тело для POST-запроса.
-        :param query_params: Строковые параметры для GET-запроса.
+        :param query_params: Строковые параметры запроса.
+
+        """
+        started_at = time.perf_counter()
+        response_size = self._handle_request(url=url, method_type=method_type, endpoint=endpoint, file_name=file_name,
+                                             payload=payload, query_params=query_params)
+        self._run_report.add("api_endpoints", endpoint,
+                             requests=1,
+                             failures=int(response_size is None),
+                             wall_seconds=time.perf_counter() - started_at,
+                             size_bytes=response_size or 0)
+
+    def _handle_request(self,
+                        url: str,
+                        method_type: str,
+                        endpoint: str,
+                        file_name: str,
+                        payload: Optional[dict] = None,
+                        query_params: Optional[dict] = None) -> Optional[int]:
+        """Выполнение запроса к API, сохранение ответа и передача его в response_handler.
+
+        :param url: url для запроса.
+        :param method_type: Тип запроса ('post' или 'get').
+        :param endpoint: эндпоинт для запроса.
+        :param file_name: наименование файла, в который будет сохранен респонс.
+        :param payload: Тело для POST-запроса.
+        :param query_params: Строковые параметры запроса.
+        :return: Размер тела ответа в байтах или None, если запрос не выполнен или ответ не является корректным JSON.
 
         """
-        if method_type == "get":
-            logger.info(f"Выполнение get запроса {endpoint}")
+        # Тело ответа читается целиком, только если его нужно передать в response_handler
+        is_streaming = self._is_streaming and self._is_dump_responses and self._response_handler is None
+        directory = f"{self._config_json.get('API_FILES_DIR')}/{endpoint}"
+        stream_retries = 0
+
+        while True:
+            if method_type == "get":
+                logger.info(f"Выполнение get запроса {endpoint}")
+
+                result_data = self._request_handler(url=url, method_type=method_type, query_params=query_params,
+                                                    stream=is_streaming)
+
+            elif method_type == "post":
+                logger.info(f"Выполнение post запроса {endpoint}")
+
+                result_data = self._request_handler(url=url, method_type=method_type, payload=payload,
+                                                    query_params=query_params, stream=is_streaming)
 
-            result_data = self._request_handler(url=url, method_type=method_type, query_params=query_params)
+            if result_data is None:
+                return None
 
-        elif method_type == "post":
-            logger.info(f"Выполнение post запроса {endpoint}")
+            if not is_streaming:
+                break
 
-            result_data = self._request_handler(url=url, method_type=method_type, payload=payload)
+            logger.info(f"Сохранение response в {directory}/{file_name}")
+            try:
+                return self._stream_response_to_dir(response=result_data, file_name=file_name, directory=directory)
+            except self._request_exception as e:
+                # Соединение оборвалось при чтении тела ответа, запрос повторяется целиком
+                stream_retries += 1
+                if stream_retries >= self._max_retries:
+                    logger.error(f"Ошибка чтения ответа {e.__class__.__name__}. Максимальное количество повторов "
+                                 f"({self._max_retries}) достигнуто. Запрос не выполнен.")
+                    return None
 
-        if result_data is not None:
-            logger.info(f"Сохранение response в {self._config_json.get('API_FILES_DIR')}/{endpoint}/{file_name}")
+                delay = self._get_backoff_delay(retries=stream_retries - 1)
+                logger.warning(f"Ошибка чтения ответа {e.__class__.__name__}. Попытка {stream_retries} / "
+                               f"{self._max_retries}. Повтор через {delay:.1f} секунд...")
+                time.sleep(delay)
 
-            APIHandler._save_response_json_to_dir(data=json.loads(result_data.content.decode("utf-8")),
-                                                  file_name=file_name,
-                                                  directory=f"{self._config_json.get('API_FILES_DIR')}/{endpoint}")
+        try:
+            data = JSONCodec.loads(result_data.content)
+        except ValueError as e:
+            logger.error(f"Ответ для {directory}/{file_name} не является корректным JSON: {e}")
+            return None
 
-    def _collect_response_for_weather(self):
-        """Собирает успешные ответы (код 200) для weather."""
-        query_params = self._config_json.get("QUERY_PARAMS_WEATHER")
-        query_params.update(appid=self._config_ini.get("API_KEY", "api_key"))
+        if self._is_dump_responses:
+            logger.info(f"Сохранение response в {directory}/{file_name}")
 
-        self._api_handler(url=self._config_ini.get("URL", "weather"),
-                          method_type="get",
-                          endpoint="weather",
-                          file_name="weather.json",
-                          query_params=query_params)
+            if self._is_streaming:
+                APIHandler._save_response_bytes_to_dir(content=result_data.content,
+                                                       file_name=file_name,
+                                                       directory=directory)
+            else:
+                APIHandler._save_response_json_to_dir(data=data,
+                                                      file_name=file_name,
+                                                      directory=directory)
+
+        if self._response_handler is not None:
+            self._response_handler(endpoint, file_name, data)
+
+        return len(result_data.content)
+
+    def _expand_endpoint_requests(self, endpoint_config: dict) -> list[dict]:
+        """Развертывание описания эндпоинта из ENDPOINTS в список запросов для всех вариантов.
+
+        Варианты задаются явным списком variants и/или матрицей variants_matrix: запрос выполняется для каждой
+        комбинации значений всех параметров query_params и payload матрицы.
+        Параметры варианта дополняют общие query_params и payload эндпоинта.
+
+        :param endpoint_config: Описание эндпоинта.
+        :return: Список аргументов для _api_handler.
+
+        """
+        endpoint = endpoint_config["name"]
+        method_type = endpoint_config.get("method", "get").lower()
+        url = endpoint_config["url"].format(**self._config_ini["URL"])
+
+        variants = list(endpoint_config.get("variants", []))
+        variants_matrix = endpoint_config.get("variants_matrix")
+        if variants_matrix:
+            # Одно декартово произведение по всем параметрам query_params и payload
+            axes = [(field, key, values)
+                    for field in ("query_params", "payload")
+                    for key, values in variants_matrix.get(field, {}).items()]
+            if axes:
+                for combination in itertools.product(*(values for _, _, values in axes)):
+                    variant = {}
+                    for (field, key, _), value in zip(axes, combination):
+                        variant.setdefault(field, {})[key] = value
+                    variants.append(variant)
+        if not variants:
+            variants = [{}]
+
+        requests_list = []
+        for idx, variant in enumerate(variants):
+            query_params = {**endpoint_config.get("query_params", {}), **variant.get("query_params", {})}
+            payload = {**endpoint_config.get("payload", {}), **variant.get("payload", {})}
+
+            if endpoint_config.get("api_key_param"):
+                query_params[endpoint_config["api_key_param"]] = self._config_ini.get("API_KEY", "api_key")
+
+            requests_list.append({
+                "url": url,
+                "method_type": method_type,
+                "endpoint": endpoint,
+                "file_name": variant.get("file_name", f"{endpoint}_{idx}.json"),
+                "payload": payload or None,
+                "query_params": query_params or None
+            })
+
+        return requests_list
 
     def collect_responses(self):
-        """Вызывает все методы для сохранения ответов для всех эндпоинтов"""
-        if "weather" in self._endpoints:
-            self._collect_response_for_weather()
+        """Сохраняет ответы для всех вариантов запросов всех эндпоинтов из ENDPOINTS.
+
+        Запросы выполняются одной пачкой в пуле потоков, количество одновременных запросов к одному хосту ограничено.
+
+        """
+        requests_list = []
+        for endpoint_config in self._endpoints:
+            requests_list.extend(self._expand_endpoint_requests(endpoint_config=endpoint_config))
+
+        logger.info(f"Запросов к API: {len(requests_list)}, эндпоинтов: {len(self._endpoints)}")
+
+        with self._run_report.stage("collect_responses"), ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = [executor.submit(self._api_handler, **request_kwargs) for request_kwargs in requests_list]
+
+            for future in futures:
+                future.result()
+
+        if self._is_run_report_owner:
+            self._run_report.save()
@@ -1,7 +1,8 @@
-import json
 from loguru import logger
 import os
 
+from src.codec.codec import JSONCodec
+
 
 class CopyJSON:
     """Класс для копирования json из конфига в директорию проекта"""
@@ -20,7 +21,7 @@ class CopyJSON:
         for trg_dir in endpoints_dirs:
             if not os.path.exists(f"{self.path_to_api}/{trg_dir}/error_400.json"):
                 with open(f"{self.path_to_api}/{trg_dir}/error_400.json", 'w', encoding='utf-8') as file:
-                    json.dump(self.json_error_400, file, ensure_ascii=False, indent=4)
+                    JSONCodec.dump(self.json_error_400, file, ensure_ascii=False, indent=4)
 
                     logger.debug(f"error_400.json сохранен в {self.path_to_api}/{trg_dir}/")
 
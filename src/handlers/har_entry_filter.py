@@ -0,0 +1,117 @@
+import os.path
+from collections import Counter
+from typing import Optional, List
+
+from loguru import logger
+
+
+class HarEntryFilter:
+    """Класс для отбора записей .har файла по метаданным до обработки тел запроса и ответа.
+
+    Для каждой причины пропуска считается количество пропущенных записей.
+
+    """
+
+    def __init__(self, content_types: List[str], skip_methods: List[str] = None, skip_frames_list: List[str] = None):
+        """Конструктор класса.
+
+        :param content_types: Content-Type ответов, для которых строятся схемы.
+        :param skip_methods: Игнорируемые методы запросов.
+        :param skip_frames_list: Наименования игнорируемых кадров, например "fetch__qs_path_api_hub_v1_streams".
+
+        """
+        self._content_types = frozenset(content_types)
+        self._skip_methods = frozenset(method.lower() for method in skip_methods or [])
+        self._skip_frames = frozenset(skip_frames_list or [])
+        self.skipped = Counter()
+
+    @staticmethod
+    def get_frame_name(resource_type: str, api_path: str) -> str:
+        """Получение наименования кадра, как его формирует SOWASchemesGenerator.merge_frames.
+
+        :param resource_type: Тип ресурса кадра.
+        :param api_path: Базовый путь к схеме.
+        :return: Наименование кадра.
+
+        """
+        return f"{resource_type}__{api_path[1::].replace('/', '_')}"
+
+    @staticmethod
+    def get_response_content_type(entry: dict) -> str:
+        """Получение Content-Type ответа. При нескольких заголовках берётся последний.
+
+        :param entry: Запись .har файла.
+        :return: Content-Type или пустая строка.
+
+        """
+        response_content_type = ""
+        for header in entry["response"]["headers"]:
+            if header["name"] == "Content-Type":
+                response_content_type = header["value"]
+
+        return response_content_type
+
+    def get_skip_reason(self, entry: dict) -> Optional[str]:
+        """Проверка записи по типу ресурса и методу запроса.
+
+        :param entry: Запись .har файла.
+        :return: Причина пропуска или None, если запись обрабатывается.
+
+        """
+        if entry["_resourceType"] != "xhr":
+            reason = "resource_type"
+        elif entry["request"]["method"].lower() in self._skip_methods:
+            reason = "method"
+        else:
+            return None
+
+        self.skipped[reason] += 1
+        return reason
+
+    def get_skip_reason_by_path(self, api_path: str, resource_type: str = "fetch") -> Optional[str]:
+        """Проверка записи по базовому пути к схеме.
+
+        :param api_path: Базовый путь к схеме.
+        :param resource_type: Тип ресурса кадра.
+        :return: Причина пропуска или None, если запись обрабатывается.
+
+        """
+        if os.path.splitext(api_path[1::])[1] != "":
+            # Файл с расширением - это статика, она не описывается схемой
+            reason = "static"
+        elif self._skip_frames and self.get_frame_name(resource_type, api_path) in self._skip_frames:
+            reason = "skip_frames_list"
+        else:
+            return None
+
+        self.skipped[reason] += 1
+        return reason
+
+    def strip_non_json_bodies(self, entry: dict) -> dict:
+        """Удаление тел запроса и ответа из записи, если Content-Type ответа не из content_types.
+
+        Запись остаётся, чтобы кадр эндпоинта был создан, но тела не разбираются и не хранятся.
+
+        :param entry: Запись .har файла.
+        :return: Исходная запись или запись только с метаданными.
+
+        """
+        if self.get_response_content_type(entry) in self._content_types:
+            return entry
+
+        self.skipped["content_type"] += 1
+        return {
+            "_resourceType": entry["_resourceType"],
+            "request": {"method": entry["request"]["method"]},
+            "response": {"headers": entry["response"]["headers"]}
+        }
+
+    def log_skipped(self, path_to_dump_file: str):
+        """Вывод количества пропущенных записей по причинам со сбросом счётчиков.
+
+        :param path_to_dump_file: Файл дампа, к которому относятся счётчики.
+
+        """
+        if self.skipped:
+            logger.info(f"Пропущено записей в {path_to_dump_file}: {dict(self.skipped)}")
+        self.skipped.clear()
@@ -0,0 +1,198 @@
+import json
+import re
+from typing import Iterator, Any, TextIO
+
+
+class JSONStreamReader:
+    """Класс для итеративного чтения элементов JSON массива из файла без загрузки всего документа в память."""
+
+    _WHITESPACE = re.compile(r"[ \t\n\r]*")
+    _NUMBER_TAIL = frozenset("0123456789.eE+-")
+
+    def __init__(self, file: TextIO, chunk_size: int = 1 << 20):
+        """Конструктор класса.
+
+        :param file: Открытый в текстовом режиме файл с JSON документом.
+        :param chunk_size: Размер блока чтения файла в символах.
+
+        """
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        """Дочитывание следующего блока файла в буфер.
+
+        :param size: Количество символов для чтения.
+        :return: False, если достигнут конец файла.
+
+        """
+        if self._eof:
+            return False
+
+        chunk = self._file.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        """Пропуск пробельных символов, при необходимости с дочитыванием файла."""
+        while True:
+            self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill(self._chunk_size):
+                return
+
+    def _next_char(self) -> str:
+        """Получение следующего значащего символа без его поглощения.
+
+        :return: Символ или пустая строка в конце файла.
+
+        """
+        self._skip_whitespace()
+        return self._buffer[self._pos:self._pos + 1]
+
+    def _expect(self, char: str):
+        """Поглощение ожидаемого символа.
+
+        :param char: Ожидаемый символ.
+
+        """
+        if self._next_char() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def _decode_value(self) -> Any:
+        """Декодирование одного JSON значения с текущей позиции.
+
+        Если значение не помещается в буфер, буфер дочитывается блоками удваивающегося размера,
+        поэтому стоимость чтения остаётся линейной от размера значения.
+
+        :return: Декодированное значение.
+
+        """
+        self._skip_whitespace()
+        read_size = self._chunk_size
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill(read_size):
+                    raise
+            else:
+                # Значение на границе буфера (например, число) может продолжаться в следующем блоке
+                is_complete = end < len(self._buffer) and not (
+                    isinstance(value, (int, float)) and self._buffer[end] in self._NUMBER_TAIL)
+                if is_complete or not self._fill(read_size):
+                    self._pos = end
+                    return value
+            read_size *= 2
+
+    def _skip_property_name(self):
+        """Пропуск ключа объекта вместе с двоеточием после него."""
+        if self._next_char() != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", self._buffer, self._pos)
+        self._decode_value()
+        self._expect(":")
+
+    def _skip_value(self):
+        """Пропуск одного JSON значения с текущей позиции без построения объектов и массивов в памяти.
+
+        Вложенные объекты и массивы обходятся с явным стеком, поэтому глубина вложенности не ограничена
+        глубиной рекурсии.
+
+        """
+        # Закрывающие скобки открытых объектов и массивов
+        stack = []
+
+        while True:
+            char = self._next_char()
+            if char == "{":
+                self._pos += 1
+                if self._next_char() != "}":
+                    self._skip_property_name()
+                    stack.append("}")
+                    continue
+                self._pos += 1
+            elif char == "[":
+                self._pos += 1
+                if self._next_char() != "]":
+                    stack.append("]")
+                    continue
+                self._pos += 1
+            else:
+                self._decode_value()
+
+            # Значение пропущено: переход к следующему элементу или закрытие завершённых контейнеров
+            while stack:
+                if self._next_char() == ",":
+                    self._pos += 1
+                    if stack[-1] == "}":
+                        self._skip_property_name()
+                    break
+                self._expect(stack.pop())
+            else:
+                return
+
+    def validate(self):
+        """Проверка, что файл содержит ровно один корректный JSON документ.
+
+        Документ читается блоками, в памяти одновременно находится не больше одного скалярного значения.
+        При ошибке выбрасывается json.JSONDecodeError.
+
+        """
+        self._skip_value()
+        if self._next_char():
+            raise json.JSONDecodeError("Extra data", self._buffer, self._pos)
+
+    def iter_items(self, *path: str) -> Iterator[Any]:
+        """Генератор элементов JSON массива, расположенного по пути из ключей объектов.
+
+        Значения, не лежащие на пути, декодируются и сразу отбрасываются,
+        элементы массива отдаются по одному.
+
+        :param path: Последовательность ключей до массива, например ("log", "entries").
+        :return: Генератор элементов массива.
+
+        """
+        if not path:
+            self._expect("[")
+            if self._next_char() == "]":
+                self._pos += 1
+                return
+
+            while True:
+                yield self._decode_value()
+
+                if self._next_char() == ",":
+                    self._pos += 1
+                else:
+                    self._expect("]")
+                    return
+
+        self._expect("{")
+        if self._next_char() == "}":
+            return
+
+        while True:
+            key = self._decode_value()
+            self._expect(":")
+
+            if key == path[0]:
+                yield from self.iter_items(*path[1:])
+                return
+
+            self._decode_value()
+
+            if self._next_char() == ",":
+                self._pos += 1
+            else:
+                self._expect("}")
+                return
@@ -1,61 +1,137 @@
-import json
-from jsonmerge import merge
-from mergedeep import merge, Strategy
+from typing import Optional, Any
+
+from src.generator.schema_interner import SchemaInterner
 
 
 class MergeJSONSchemes:
+    """Объединение JSON схем: схема-результат описывает все значения, описанные объединяемыми схемами.
+
+    Правила объединения:
+    type - объединение без повторов в порядке появления;
+    properties - объединение, одинаковые свойства объединяются рекурсивно;
+    items - объединение по позициям элементов;
+    maxLength, maximum, maxItems - большее значение, minLength, minimum, minItems - меньшее значение;
+    required - пересечение, пустой список не сохраняется;
+    остальные атрибуты - значение первой схемы.
+
+    Ключи результата идут в порядке первого появления, поэтому объединение ассоциативно.
+
+    """
+
+    MAX_KEYWORDS = frozenset(("maxLength", "maximum", "maxItems"))
+    MIN_KEYWORDS = frozenset(("minLength", "minimum", "minItems"))
 
     @staticmethod
-    def merge_schemes_by_jsonmerge(schemes: list[str | dict]) -> str | dict:
-        element_type_in_list = ""
+    def _merge_types(target_types: Any, source_types: Any) -> Any:
+        """Объединение значений type без повторов.
 
-        for element in schemes:
-            if isinstance(element, str):
-                element_type_in_list = "str"
-            elif isinstance(element, dict):
-                element_type_in_list = "dict"
-            else:
-                raise TypeError
+        :param target_types: type схемы-приёмника.
+        :param source_types: type схемы-источника.
+        :return: Объединённый type. Списки не изменяются на месте, так как могут быть общими.
 
-        merged_schemes = {}
+        """
+        target_list = target_types if isinstance(target_types, list) else [target_types]
+        source_list = source_types if isinstance(source_types, list) else [source_types]
 
-        for schema in schemes:
-            if element_type_in_list == "str":
-                schema = json.loads(schema)
-            merged_schemes = merge(merged_schemes, schema)
+        missing_types = [schema_type for schema_type in source_list if schema_type not in target_list]
+        if not missing_types:
+            return target_types
 
-        if element_type_in_list == "str":
-            return json.dumps(merged_schemes)
-        else:
-            return merged_schemes
+        merged_types = list(target_list)
+        for schema_type in missing_types:
+            if schema_type not in merged_types:
+                merged_types.append(schema_type)
+        return merged_types
 
     @staticmethod
-    def merge_schemes_from_list_str_by_mergedeep(schemas_list: list[str | dict]) -> str | dict:
-        """Объединение нескольких JSON схем в одну.
+    def _mutable_node(node: dict, schema_interner: Optional[SchemaInterner] = None) -> dict:
+        """Получение узла, который можно изменять на месте.
 
-        :param schemas_list: Список JSON схем.
-        :return: Объединённая JSON схема.
+        :param node: Узел схемы.
+        :param schema_interner: Хранилище канонических узлов.
+        :return: Копия узла, если он канонический, иначе сам узел.
 
         """
-        element_type_in_list = ""
+        if schema_interner is not None and schema_interner.is_interned(node):
+            return dict(node)
+        return node
+
+    @staticmethod
+    def merge_schemes_in_place(target: dict,
+                               source: dict,
+                               schema_interner: Optional[SchemaInterner] = None) -> dict:
+        """Объединение схемы-источника со схемой-приёмником на месте, без копирования и сериализации.
+
+        Поддеревья источника, которых нет в приёмнике, переиспользуются, а не копируются.
+        Одинаковые (общие) поддеревья не обходятся. Вложенные схемы объединяются с явным стеком,
+        поэтому глубина схем не ограничена глубиной рекурсии.
+
+        :param target: Схема-приёмник, изменяется на месте.
+        :param source: Схема-источник. После объединения её поддеревья принадлежат приёмнику.
+        :param schema_interner: Хранилище канонических узлов. Канонические узлы приёмника перед изменением копируются.
+        :return: Схема-приёмник или её копия, если приёмник - канонический узел.
+
+        """
+        if target is source:
+            return target
+
+        mutable_node = MergeJSONSchemes._mutable_node
+        target = mutable_node(target, schema_interner)
+        # Элемент стека: пара (узел приёмника, узел источника). Канонический узел приёмника копируется
+        # и заменяется копией в родителе до того, как пара попадает в стек
+        stack = [(target, source)]
+
+        while stack:
+            target_node, source_node = stack.pop()
+
+            for key, value in source_node.items():
+                if key not in target_node:
+                    if key != "required":
+                        target_node[key] = value
+                    continue
+
+                target_value = target_node[key]
+                if target_value is value:
+                    continue
+
+                if key == "type":
+                    target_node[key] = MergeJSONSchemes._merge_types(target_types=target_value, source_types=value)
+
+                elif key == "properties" and isinstance(target_value, dict) and isinstance(value, dict):
+                    target_value = target_node[key] = mutable_node(target_value, schema_interner)
+                    for prop, prop_schema in value.items():
+                        if prop not in target_value:
+                            target_value[prop] = prop_schema
+                        elif target_value[prop] is not prop_schema:
+                            prop_target = target_value[prop] = mutable_node(target_value[prop], schema_interner)
+                            stack.append((prop_target, prop_schema))
+
+                elif key == "items" and isinstance(target_value, list) and isinstance(value, list):
+                    # Новый список items: объединение по позициям, списки не изменяются на месте
+                    merged_items = list(target_value) if len(target_value) >= len(value) else \
+                        target_value + value[len(target_value):]
+                    for idx in range(min(len(target_value), len(value))):
+                        if merged_items[idx] is not value[idx]:
+                            item_target = merged_items[idx] = mutable_node(merged_items[idx], schema_interner)
+                            stack.append((item_target, value[idx]))
+                    target_node[key] = merged_items
 
-        for element in schemas_list:
-            if isinstance(element, str):
-                element_type_in_list = "str"
-            elif isinstance(element, dict):
-                element_type_in_list = "dict"
-            else:
-                raise TypeError
+                elif key == "required" and isinstance(target_value, list) and isinstance(value, list):
+                    target_node[key] = [prop for prop in target_value if prop in value]
 
-        merged_schema_dict = {}
+                elif key in MergeJSONSchemes.MAX_KEYWORDS or key in MergeJSONSchemes.MIN_KEYWORDS:
+                    if isinstance(target_value, (int, float)) and isinstance(value, (int, float)):
+                        if key in MergeJSONSchemes.MAX_KEYWORDS:
+                            target_node[key] = max(target_value, value)
+                        else:
+                            target_node[key] = min(target_value, value)
 
-        for schema in schemas_list:
-            if element_type_in_list == "str":
-                schema = json.loads(schema)
+                elif isinstance(target_value, dict) and isinstance(value, dict):
+                    target_value = target_node[key] = mutable_node(target_value, schema_interner)
+                    stack.append((target_value, value))
 
-            merged_schema_dict = merge({}, merged_schema_dict, schema, strategy=Strategy.ADDITIVE)
+            # Свойство обязательно, только если оно обязательно во всех объединяемых схемах
+            if "required" in target_node and ("required" not in source_node or not target_node["required"]):
+                del target_node["required"]
 
-        if element_type_in_list == "str":
-            return json.dumps(merged_schema_dict)
-        elif element_type_in_list == "dict":
-            return merged_schema_dict
+        return target
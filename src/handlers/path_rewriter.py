@@ -0,0 +1,92 @@
+import re
+from collections import OrderedDict
+
+from loguru import logger
+
+
+class PathRewriter:
+    """Класс для преобразования пути запроса в url и api_path схемы по шаблонам REPLACE_PATTERNS.
+
+    Шаблоны компилируются один раз, результат для каждого пути запоминается (LRU), для каждого шаблона
+    считается количество путей, в которых он сработал.
+
+    """
+
+    def __init__(self, replace_patterns: dict, cache_size: int = 4096):
+        """Конструктор класса.
+
+        :param replace_patterns: Шаблоны замены из config.json, сгруппированные по методу замены (url, api_path).
+        :param cache_size: Максимальное количество запоминаемых путей.
+
+        """
+        self._replace_patterns = replace_patterns
+        self._compiled_patterns = {
+            replace_method: [(re.compile(replace["pattern"]), replace["replace"]) for replace in replaces]
+            for replace_method, replaces in replace_patterns.items()
+        }
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self.hits = {replace_method: [0] * len(replaces) for replace_method, replaces in replace_patterns.items()}
+
+    def __getstate__(self) -> dict:
+        """Состояние для передачи в процесс пула без накопленного кэша и счётчиков.
+
+        :return: Состояние объекта.
+
+        """
+        state = self.__dict__.copy()
+        state["_cache"] = OrderedDict()
+        state["hits"] = {replace_method: [0] * len(hits) for replace_method, hits in self.hits.items()}
+        return state
+
+    def _replace(self, string: str, replace_method: str) -> tuple[str, list[int]]:
+        """Последовательная замена подстрок в строке шаблонами метода замены.
+
+        :param string: Исходная строка.
+        :param replace_method: Метод замены, описанный в replace_patterns.
+        :return: Строка после замены и индексы сработавших шаблонов.
+
+        """
+        matched = []
+        for idx, (pattern, replace) in enumerate(self._compiled_patterns[replace_method]):
+            string, count = pattern.subn(replace, string)
+            if count:
+                matched.append(idx)
+
+        return string, matched
+
+    def rewrite(self, path: str) -> tuple[str, str]:
+        """Получение url и api_path для пути запроса.
+
+        :param path: Путь запроса.
+        :return: Пара (url, api_path).
+
+        """
+        cached = self._cache.get(path)
+        if cached is None:
+            url, url_matched = self._replace(string=path, replace_method="url")
+            api_path, api_path_matched = self._replace(string=path, replace_method="api_path")
+            cached = (url, api_path, url_matched, api_path_matched)
+
+            self._cache[path] = cached
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(path)
+
+        url, api_path, url_matched, api_path_matched = cached
+        for idx in url_matched:
+            self.hits["url"][idx] += 1
+        for idx in api_path_matched:
+            self.hits["api_path"][idx] += 1
+
+        return url, api_path
+
+    def log_hits(self):
+        """Вывод количества срабатываний каждого шаблона. Шаблоны без срабатываний выводятся как предупреждение."""
+        for replace_method, hits in self.hits.items():
+            for replace, count in zip(self._replace_patterns[replace_method], hits):
+                if count:
+                    logger.debug(f"Шаблон {replace_method} {replace['pattern']!r}: {count} срабатываний")
+                else:
+                    logger.warning(f"Шаблон {replace_method} {replace['pattern']!r} не сработал ни разу")
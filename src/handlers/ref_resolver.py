@@ -0,0 +1,161 @@
+import json
+from typing import Any, Generator
+from urllib.parse import unquote
+
+from src.codec.codec import JSONCodec
+
+
+class UnsupportedRefError(Exception):
+    pass
+
+
+class RefResolver:
+    """Класс для загрузки JSON документа с разрешением ссылок $ref за один проход."""
+
+    def __init__(self, document: Any):
+        """Конструктор класса.
+
+        :param document: Декодированный JSON документ. Изменяется на месте при разрешении ссылок.
+
+        """
+        self._document = document
+        self._resolved_refs = {}
+        self._refs_in_progress = set()
+
+    @staticmethod
+    def loads(dump_data: str) -> Any:
+        """Декодирование JSON документа с разрешением ссылок $ref.
+
+        Документ без $ref декодируется одним вызовом JSONCodec.loads. Локальные ссылки ("#/...") разрешаются за один проход
+        с кэшем разрешённых целей. Внешние и циклические ссылки разрешаются через jsonref, как и раньше.
+
+        :param dump_data: Содержимое .json файла.
+        :return: Документ, в котором ссылки заменены на их цели.
+
+        """
+        document = JSONCodec.loads(dump_data)
+
+        if "$ref" not in dump_data and "u0024ref" not in dump_data:
+            return document
+
+        try:
+            return RefResolver(document).resolve()
+        except UnsupportedRefError:
+            return RefResolver.loads_by_jsonref(dump_data)
+
+    @staticmethod
+    def loads_by_jsonref(dump_data: str) -> Any:
+        """Декодирование JSON документа с разрешением ссылок через jsonref.
+
+        :param dump_data: Содержимое .json файла.
+        :return: Документ, в котором ссылки заменены на их цели.
+
+        """
+        # jsonref нужен только для внешних и циклических ссылок, поэтому импортируется здесь
+        import jsonref
+
+        return jsonref.JsonRef.replace_refs(json.loads(json.dumps(jsonref.loads(dump_data), default=dict)))
+
+    def resolve(self) -> Any:
+        """Разрешение всех ссылок документа.
+
+        Вложенные вызовы _walk и _resolve_ref выполняются через явный стек генераторов, поэтому глубина документа
+        и цепочек ссылок не ограничена пределом рекурсии. Генератор отдаёт генератор вложенного вызова и получает
+        его результат через send.
+
+        :return: Документ, в котором ссылки заменены на их цели.
+
+        """
+        stack = [self._walk(self._document)]
+        result = None
+
+        while stack:
+            try:
+                call = stack[-1].send(result)
+            except StopIteration as stop:
+                stack.pop()
+                result = stop.value
+                continue
+
+            stack.append(call)
+            result = None
+
+        return result
+
+    @staticmethod
+    def _get_ref(node: Any) -> str | None:
+        """Получение ссылки, если узел является объектом-ссылкой.
+
+        :param node: Узел документа.
+        :return: Значение $ref или None.
+
+        """
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                return ref
+        return None
+
+    def _walk(self, node: Any) -> Generator:
+        """Замена ссылок в узле и его потомках на месте.
+
+        :param node: Узел документа.
+        :return: Генератор, который возвращает узел с разрешёнными ссылками.
+
+        """
+        ref = self._get_ref(node)
+        if ref is not None:
+            return (yield self._resolve_ref(ref))
+
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(value, (dict, list)):
+                    node[key] = yield self._walk(value)
+        elif isinstance(node, list):
+            for idx, value in enumerate(node):
+                if isinstance(value, (dict, list)):
+                    node[idx] = yield self._walk(value)
+
+        return node
+
+    def _resolve_ref(self, ref: str) -> Generator:
+        """Разрешение локальной ссылки по JSON pointer с кэшированием результата.
+
+        :param ref: Значение $ref.
+        :return: Генератор, который возвращает цель ссылки с разрешёнными ссылками.
+
+        """
+        if ref in self._resolved_refs:
+            return self._resolved_refs[ref]
+
+        if not ref.startswith("#") or ref in self._refs_in_progress:
+            raise UnsupportedRefError(ref)
+
+        self._refs_in_progress.add(ref)
+
+        pointer = ref[1:]
+        target = self._document
+        for part in unquote(pointer.lstrip("/")).split("/") if pointer else []:
+            part = part.replace("~1", "/").replace("~0", "~")
+
+            # Путь может проходить через другую ссылку
+            target_ref = self._get_ref(target)
+            if target_ref is not None:
+                target = yield self._resolve_ref(target_ref)
+
+            if isinstance(target, list):
+                try:
+                    part = int(part)
+                except ValueError:
+                    pass
+            try:
+                target = target[part]
+            except (TypeError, LookupError):
+                raise UnsupportedRefError(ref)
+
+        resolved = yield self._walk(target)
+
+        self._refs_in_progress.discard(ref)
+        self._resolved_refs[ref] = resolved
+
+        return resolved
@@ -0,0 +1,60 @@
+import codecs
+from typing import Iterator, BinaryIO
+
+
+class ResponseStream:
+    """Класс-обёртка над телом ответа, которая сохраняет полученные байты в файл и отдаёт их как текст.
+
+    Используется как файл для JSONStreamReader, поэтому ответ сохраняется и проверяется за одно чтение из сети.
+
+    """
+
+    def __init__(self, chunks: Iterator[bytes], file: BinaryIO, encoding: str = "utf-8"):
+        """Конструктор класса.
+
+        :param chunks: Итератор блоков тела ответа, например response.iter_content(...).
+        :param file: Открытый в бинарном режиме файл, в который сохраняется тело ответа.
+        :param encoding: Кодировка тела ответа.
+
+        """
+        self._chunks = chunks
+        self._file = file
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._eof = False
+        self._pending = ""
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> str:
+        """Чтение следующих size символов тела ответа.
+
+        Блоки тела ответа дочитываются, пока не наберётся size символов, поэтому чтение блоками удваивающегося
+        размера в JSONStreamReader остаётся линейным от размера значения.
+
+        :param size: Количество символов. При отрицательном значении читается весь оставшийся ответ.
+        :return: Декодированный текст или пустая строка в конце ответа.
+
+        """
+        parts = [self._pending] if self._pending else []
+        length = len(self._pending)
+
+        while not self._eof and (size < 0 or length < size):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                text = self._decoder.decode(b"", final=True)
+            else:
+                self._file.write(chunk)
+                self.bytes_read += len(chunk)
+                text = self._decoder.decode(chunk)
+
+            if text:
+                parts.append(text)
+                length += len(text)
+
+        text = "".join(parts)
+        if 0 <= size < len(text):
+            # Лишние символы последнего блока отдаются при следующем чтении
+            text, self._pending = text[:size], text[size:]
+        else:
+            self._pending = ""
+        return text
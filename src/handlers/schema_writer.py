@@ -0,0 +1,155 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from loguru import logger
+
+from src.codec.codec import JSONCodec
+
+
+class SchemaWriter:
+    """Пакетная запись файлов схем.
+
+    Схемы накапливаются через add и записываются одним пакетом в flush: каждая директория создаётся один раз,
+    при повторной записи в тот же путь сохраняется последняя схема. Файл записывается через временный файл
+    и переименование, поэтому читатели не видят частично записанный файл. Файл не перезаписывается,
+    если хэш нового содержимого совпадает с хэшем записанного ранее. Хэши, размеры и время изменения записанных
+    файлов хранятся в индексе, при отсутствии записи в индексе сравнивается хэш файла на диске.
+
+    """
+
+    def __init__(self, path_to_index: Optional[str] = None, workers: int = 4, files_log_level: str = "INFO"):
+        """Конструктор класса.
+
+        :param path_to_index: Путь к индексу хэшей записанных схем. Если не задан, сравнивается хэш файла на диске.
+        :param workers: Количество потоков для записи файлов.
+        :param files_log_level: Уровень сообщений о каждой директории и каждом записанном файле.
+
+        """
+        self.path_to_index = path_to_index
+        self.workers = max(1, workers)
+        self.files_log_level = files_log_level
+        self._files = {}
+        self._schemes = {}
+        self.written = 0
+        self.unchanged = 0
+
+        if self.path_to_index and os.path.exists(self.path_to_index):
+            with open(self.path_to_index, "r", encoding="UTF-8") as index_file:
+                self._files = JSONCodec.load(index_file).get("files", {})
+
+    def __getstate__(self) -> dict:
+        # Схемы записываются только в родительском процессе, индекс в процессы пула не передаётся
+        state = self.__dict__.copy()
+        state["_files"] = {}
+        state["_schemes"] = {}
+        return state
+
+    def add(self, path_to_schema: str, schema: dict):
+        """Добавление схемы в очередь на запись.
+
+        :param path_to_schema: Абсолютный путь к файлу схемы.
+        :param schema: Схема. Сериализуется при записи, поэтому не должна изменяться до вызова flush.
+
+        """
+        # Повторная запись в тот же путь заменяет схему, порядок записи определяется первым добавлением
+        self._schemes[path_to_schema] = schema
+
+    @staticmethod
+    def get_content_hash(content: bytes) -> str:
+        """Вычисление хэша содержимого файла схемы.
+
+        :param content: Сериализованная схема.
+        :return: Хэш содержимого.
+
+        """
+        return hashlib.blake2b(content, digest_size=20).hexdigest()
+
+    def _is_unchanged(self, path_to_schema: str, content: bytes, content_hash: str) -> bool:
+        """Проверка, что файл схемы уже содержит такое же содержимое.
+
+        :param path_to_schema: Абсолютный путь к файлу схемы.
+        :param content: Сериализованная схема.
+        :param content_hash: Хэш сериализованной схемы.
+        :return: True, если файл можно не перезаписывать.
+
+        """
+        try:
+            stat = os.stat(path_to_schema)
+        except FileNotFoundError:
+            return False
+
+        if stat.st_size != len(content):
+            return False
+
+        record = self._files.get(path_to_schema)
+        if record is not None and record["mtime_ns"] == stat.st_mtime_ns and record["size"] == stat.st_size:
+            return record["hash"] == content_hash
+
+        # Файл изменён не этим классом или отсутствует в индексе, сравнивается его содержимое
+        with open(path_to_schema, "rb") as schema_file:
+            return self.get_content_hash(schema_file.read()) == content_hash
+
+    def _write_file(self, path_to_schema: str, schema: dict) -> tuple[str, dict, bool]:
+        """Запись файла схемы через временный файл, если содержимое изменилось.
+
+        :param path_to_schema: Абсолютный путь к файлу схемы.
+        :param schema: Схема.
+        :return: Путь к файлу, запись индекса и признак того, что файл был записан.
+
+        """
+        content = JSONCodec.dumps(schema).encode("utf-8")
+        content_hash = self.get_content_hash(content)
+
+        is_written = not self._is_unchanged(path_to_schema=path_to_schema, content=content, content_hash=content_hash)
+        if is_written:
+            path_to_tmp_schema = f"{path_to_schema}.tmp"
+            try:
+                with open(path_to_tmp_schema, "wb") as schema_file:
+                    schema_file.write(content)
+                os.replace(path_to_tmp_schema, path_to_schema)
+            except BaseException:
+                if os.path.exists(path_to_tmp_schema):
+                    os.remove(path_to_tmp_schema)
+                raise
+
+        stat = os.stat(path_to_schema)
+        return path_to_schema, {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash}, is_written
+
+    def flush(self):
+        """Запись накопленных схем и сохранение индекса."""
+        if not self._schemes:
+            return
+
+        for path_to_schema_dir in dict.fromkeys(os.path.dirname(path) for path in self._schemes):
+            os.makedirs(path_to_schema_dir, exist_ok=True)
+            logger.opt(lazy=True).log(self.files_log_level, "Создание директории для сохранения схем: {}",
+                                      lambda: path_to_schema_dir[path_to_schema_dir.find("schemes")::])
+
+        schemes, self._schemes = self._schemes, {}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(schemes))) as executor:
+            results = executor.map(lambda item: self._write_file(*item), schemes.items())
+
+            for path_to_schema, record, is_written in results:
+                self._files[path_to_schema] = record
+                if is_written:
+                    self.written += 1
+                    logger.opt(lazy=True).log(self.files_log_level, "Сохранение файла: {}",
+                                              lambda: path_to_schema[path_to_schema.find("schemes")::])
+                else:
+                    self.unchanged += 1
+
+        logger.info(f"Записано файлов схем: {self.written}, без изменений: {self.unchanged}")
+
+        if self.path_to_index:
+            self.save_index()
+
+    def save_index(self):
+        """Запись индекса через временный файл, чтобы не оставить его частично записанным."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path_to_index)), exist_ok=True)
+        path_to_tmp_index = f"{self.path_to_index}.tmp"
+
+        with open(path_to_tmp_index, "w", encoding="UTF-8") as index_file:
+            JSONCodec.dump({"files": self._files}, index_file, ensure_ascii=False)
+        os.replace(path_to_tmp_index, self.path_to_index)
@@ -1,24 +1,60 @@
+import argparse
 import logging
 import sys
 from loguru import logger
 
-from src.json_schemes_generator import SOWASchemesGenerator
+from src.processor.json_schemes_generator import SOWASchemesGenerator
+from src.processor.api_schemes_pipeline import APISchemesPipeline
 from src.handlers.api_handler import APIHandler
-from src.configs.config import config_json, config_ini
+from src.configs.config import get_config_json, get_config_ini
 from src.handlers.copy_json import CopyJSON
+from src.codec.codec import JSONCodec
+from src.report.run_report import RunReport
 
 
-def main(from_har: bool = False, from_api: bool = False):
+def main(from_har: bool = False,
+         from_api: bool = False,
+         workers: int = 1,
+         incremental: bool = False,
+         direct: bool = False,
+         bulk: bool = False):
     """
 
     :param from_har: Запуск генератора json схем на основе .har файла.
     :param from_api: Запуск обработчика api и сохранение всех ответов в виде json файлов.
+    :param workers: Количество процессов для генерации json схем.
+    :param incremental: Обрабатывать только новые и изменившиеся файлы дампов.
+    :param direct: Генерировать схемы из ответов api по мере их получения, без чтения файлов дампов.
+    :param bulk: Режим массового запуска: итоги по файлам и эндпоинтам и строка прогресса вместо сообщений по каждому
+        запросу.
 
     """
-    if from_api and not from_har:
+    config_json = get_config_json()
+    config_ini = get_config_ini()
+
+    JSONCodec.use(config_json.get("VARIABLES").get("json_codec", "auto"))
+    # Один отчёт о запуске для сбора ответов api и генерации схем
+    run_report = RunReport.from_config(config_json)
+
+    if from_api and not from_har and direct:
         logger.info(f"Запуск сервиса создания json scheme")
 
-        api_handler_instance = APIHandler(config_json=config_json, config_ini=config_ini)
+        if incremental:
+            logger.warning(f"Флаг incremental не используется при генерации схем напрямую из ответов api")
+
+        api_schemes_pipeline_instance = APISchemesPipeline(config_json=config_json,
+                                                           config_ini=config_ini,
+                                                           workers=workers,
+                                                           run_report=run_report,
+                                                           is_bulk_run=bulk)
+        logger.info(f"Запуск сбора респонсов и генерации json scheme из них")
+        logger.debug(f"Вызов метода run")
+        api_schemes_pipeline_instance.run()
+
+    elif from_api and not from_har:
+        logger.info(f"Запуск сервиса создания json scheme")
+
+        api_handler_instance = APIHandler(config_json=config_json, config_ini=config_ini, run_report=run_report)
         logger.info(f"Запуск api обработчика для сохранения всех необходимых респонсов")
         logger.debug(f"Вызов метода collect_responses")
         api_handler_instance.collect_responses()
@@ -29,7 +65,11 @@ def main(from_har: bool = False, from_api: bool = False):
         copy_json_instance.copy_json_error_to_responses_dir()
 
         sowa_schemes_generator_instance = SOWASchemesGenerator(is_from_api=True,
-                                                               config_json=config_json)
+                                                               config_json=config_json,
+                                                               workers=workers,
+                                                               is_incremental=incremental,
+                                                               run_report=run_report,
+                                                               is_bulk_run=bulk)
         logger.info(f"Запуск генератора json scheme из .json файлов")
         logger.debug(f"Вызов метода build_sowa_schemes")
         sowa_schemes_generator_instance.build_sowa_schemes()
@@ -39,7 +79,11 @@ def main(from_har: bool = False, from_api: bool = False):
 
         logger.info(f"Для .har файлов")
         sowa_schemes_generator_instance = SOWASchemesGenerator(is_from_har=True,
-                                                               config_json=config_json)
+                                                               config_json=config_json,
+                                                               workers=workers,
+                                                               is_incremental=incremental,
+                                                               run_report=run_report,
+                                                               is_bulk_run=bulk)
         logger.info(f"Запуск генератора json scheme из .har файлов")
         sowa_schemes_generator_instance.build_sowa_schemes()
 
@@ -47,12 +91,31 @@ def main(from_har: bool = False, from_api: bool = False):
         raise ValueError(
             f"Укажите только одно True значение в аргументах from_har или from_api при вызове main() функции")
 
+    run_report.save()
     logger.info(f"Завершение работы сервиса создания json scheme")
 
 
 if __name__ == '__main__':
 
+    parser = argparse.ArgumentParser(description="Генератор json схем из .har файлов или ответов api")
+    parser.add_argument("--from-har", action="store_true", help="Создать схемы из .har файлов")
+    parser.add_argument("--from-api", action="store_true", help="Собрать ответы api и создать схемы из .json файлов")
+    parser.add_argument("--workers", type=int, default=1, help="Количество процессов для генерации схем")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Обработать только новые и изменившиеся файлы дампов")
+    parser.add_argument("--direct", action="store_true",
+                        help="Вместе с --from-api: создать схемы из ответов api по мере их получения, без файлов дампов")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Режим массового запуска: уровень INFO, итоги по файлам и эндпоинтам и строка прогресса")
+    args = parser.parse_args()
+
+    # В режиме массового запуска сообщения по каждому запросу и файлу схемы выводятся на уровне DEBUG и отбрасываются
     logger.remove()
-    logger.add(sys.stdout, colorize=True, backtrace=True, level=logging.DEBUG)
-
-    main(from_har=False, from_api=False)
+    logger.add(sys.stdout, colorize=True, backtrace=True, level=logging.INFO if args.bulk else logging.DEBUG)
+
+    main(from_har=args.from_har,
+         from_api=args.from_api,
+         workers=args.workers,
+         incremental=args.incremental,
+         direct=args.direct,
+         bulk=args.bulk)
@@ -0,0 +1,152 @@
+import queue
+import threading
+from configparser import ConfigParser
+from typing import Any, Iterator, Optional
+
+from loguru import logger
+
+from src.handlers.api_handler import APIHandler
+from src.handlers.copy_json import CopyJSON
+from src.handlers.har_entry_filter import HarEntryFilter
+from src.processor.json_schemes_generator import SOWASchemesGenerator
+from src.report.run_report import RunReport
+
+
+class APISchemesPipeline:
+    """Сбор ответов API и генерация схем одновременно, без промежуточного чтения файлов дампов.
+
+    Ответы передаются из потоков APIHandler в генератор через ограниченную очередь, поэтому генерация схем
+    выполняется, пока остальные запросы ждут ответа сети, а в памяти не копится больше queue_size ответов.
+
+    """
+
+    _END_OF_RESPONSES = None
+
+    def __init__(self,
+                 config_json: dict,
+                 config_ini: ConfigParser,
+                 workers: int = 1,
+                 run_report: Optional[RunReport] = None,
+                 is_bulk_run: bool = False):
+        """Конструктор класса.
+
+        :param config_json: Конфигурация из config.json.
+        :param config_ini: Конфигурация из config.ini.
+        :param workers: Количество процессов для генерации схем.
+        :param run_report: Общий отчёт о запуске. По умолчанию отчёт создаётся по RUN_REPORT_PATH
+            и сохраняется в конце run.
+        :param is_bulk_run: Режим массового запуска генератора схем, см. SOWASchemesGenerator.
+
+        """
+        self._config_json = config_json
+        self._config_ini = config_ini
+        self._workers = workers
+        self._is_bulk_run = is_bulk_run
+        self._is_run_report_owner = run_report is None
+        self._run_report = RunReport.from_config(config_json) if run_report is None else run_report
+
+        variables = self._config_json.get("VARIABLES")
+        self._is_dump_responses = variables.get("api_pipeline_dump_responses", False)
+        self._responses_queue = queue.Queue(maxsize=variables.get("api_pipeline_queue_size", 64))
+        self._skip_frames = frozenset(self._config_json.get("SKIP_FRAMES_LIST", []))
+        self._responded_endpoints = {}
+        self._skipped_endpoints = {}
+        self._collector_error = None
+        self._is_responses_ended = False
+
+    def _is_skipped_endpoint(self, endpoint: str) -> bool:
+        """Проверка эндпоинта по SKIP_FRAMES_LIST, как при чтении .json файлов дампов.
+
+        :param endpoint: Эндпоинт запроса.
+        :return: True, если ответы эндпоинта не используются для генерации схем.
+
+        """
+        frame_name = HarEntryFilter.get_frame_name(resource_type="fetch", api_path=f"/api/v2/{endpoint}")
+        if frame_name not in self._skip_frames:
+            return False
+
+        if endpoint not in self._skipped_endpoints:
+            self._skipped_endpoints[endpoint] = True
+            logger.info(f"Пропуск ответов эндпоинта {endpoint}: кадр {frame_name} в SKIP_FRAMES_LIST")
+        return True
+
+    def _put_response(self, endpoint: str, file_name: str, data: Any):
+        """Передача ответа в очередь генератора. Вызывается из потоков APIHandler.
+
+        Ответы эндпоинтов из SKIP_FRAMES_LIST в очередь не передаются.
+
+        :param endpoint: Эндпоинт запроса.
+        :param file_name: Наименование файла ответа.
+        :param data: Декодированный ответ.
+
+        """
+        if self._is_skipped_endpoint(endpoint=endpoint):
+            return
+
+        self._responded_endpoints.setdefault(endpoint, True)
+        self._responses_queue.put({"type": "api", "api_path": endpoint, "dump_file_name": file_name, "package": data})
+
+    def _collect_responses(self):
+        """Сбор ответов API. Выполняется в отдельном потоке, по завершении в очередь кладётся признак конца."""
+        try:
+            api_handler_instance = APIHandler(config_json=self._config_json,
+                                              config_ini=self._config_ini,
+                                              response_handler=self._put_response,
+                                              is_dump_responses=self._is_dump_responses,
+                                              run_report=self._run_report)
+            api_handler_instance.collect_responses()
+
+            # Ошибочный ответ добавляется к каждому эндпоинту, как это делает CopyJSON для файлов дампов
+            error_400 = self._config_json.get("RESPONSE_ERROR_400")
+            for endpoint in self._responded_endpoints:
+                self._put_response(endpoint=endpoint, file_name="error_400.json", data=error_400)
+
+            if self._is_dump_responses and self._responded_endpoints:
+                CopyJSON(config_json=self._config_json).copy_json_error_to_responses_dir()
+        except BaseException as e:
+            self._collector_error = e
+        finally:
+            self._responses_queue.put(self._END_OF_RESPONSES)
+
+    def _iter_responses(self) -> Iterator[dict]:
+        """Генератор ответов из очереди до признака конца.
+
+        :return: Запросы в формате SOWASchemesGenerator.parse_dump_file.
+
+        """
+        while True:
+            entry = self._responses_queue.get()
+            if entry is self._END_OF_RESPONSES:
+                self._is_responses_ended = True
+                return
+            yield entry
+
+    def run(self):
+        """Сбор ответов API и генерация схем."""
+        sowa_schemes_generator_instance = SOWASchemesGenerator(is_from_api=True,
+                                                               config_json=self._config_json,
+                                                               workers=self._workers,
+                                                               run_report=self._run_report,
+                                                               is_bulk_run=self._is_bulk_run)
+
+        collector_thread = threading.Thread(target=self._collect_responses, name="api-collector")
+        collector_thread.start()
+
+        try:
+            sowa_schemes_generator_instance.build_sowa_schemes(entries=self._iter_responses())
+        except BaseException:
+            # Очередь освобождается, чтобы потоки сбора не остались заблокированными на put
+            if not self._is_responses_ended:
+                for _ in self._iter_responses():
+                    pass
+            raise
+        finally:
+            collector_thread.join()
+
+        if self._collector_error is not None:
+            raise self._collector_error
+
+        logger.info(f"Эндпоинтов со схемами из ответов API: {len(self._responded_endpoints)}")
+
+        if self._is_run_report_owner:
+            self._run_report.save()
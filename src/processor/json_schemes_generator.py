@@ -1,17 +1,30 @@
-from typing import Optional, List
-import json
-import jsonref
+from typing import Optional, List, Iterable, Iterator, Any
+from collections import deque, Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
 import os
+import pickle
+import time
 import os.path
-import re
 from urllib.parse import urlparse
-from haralyzer import HarParser
 from loguru import logger
 from configparser import ConfigParser
 
+from src.cache.build_manifest import BuildManifest
+from src.cache.schema_cache import SchemaCache
+from src.codec.codec import JSONCodec
 from src.recorder.recorder import Recorder
+from src.report.run_report import RunReport
+from src.report.progress_reporter import ProgressReporter
+from src.generator.schema_options import SchemaOptions
+from src.generator.schema_interner import SchemaInterner
+from src.handlers.json_stream_reader import JSONStreamReader
+from src.handlers.ref_resolver import RefResolver
 from src.handlers.merge_json_schemes import MergeJSONSchemes
-from src.handlers.deduplicate_array_elements import ArrayElementDeduplicator
+from src.handlers.path_rewriter import PathRewriter
+from src.handlers.har_entry_filter import HarEntryFilter
+from src.handlers.schema_writer import SchemaWriter
 
 
 class SOWASchemesGenerator:
@@ -21,16 +34,36 @@ class SOWASchemesGenerator:
                  config_json: dict,
                  is_from_har: bool = False,
                  is_from_api: bool = False,
-                 skip_frames_list: Optional[List[str]] = None):
+                 skip_frames_list: Optional[List[str]] = None,
+                 is_har_streaming: bool = True,
+                 workers: int = 1,
+                 entries_chunk_size: int = 200,
+                 use_schema_cache: bool = True,
+                 is_incremental: bool = False,
+                 run_report: Optional[RunReport] = None,
+                 is_bulk_run: bool = False):
         """Инициализация генератора конфигурации SOWA.
 
-        :param skip_frames_list: Список игнорируемых методов в har файле.
+        :param skip_frames_list: Список игнорируемых кадров. По умолчанию SKIP_FRAMES_LIST из config.json.
         :param is_from_har: Читать .har файлы.
         :param is_from_api: Читать .json файлы.
+        :param is_har_streaming: Читать записи .har файлов потоково, не загружая файл целиком.
+        :param workers: Количество процессов для генерации схем. При значении 1 генерация выполняется последовательно.
+        :param entries_chunk_size: Количество запросов в одной порции, передаваемой в процесс генерации.
+        :param use_schema_cache: Использовать дисковый кэш схем для неизменившейся полезной нагрузки.
+        :param is_incremental: Обрабатывать только новые и изменившиеся файлы дампов и перезаписывать только
+            схемы затронутых ими эндпоинтов.
+        :param run_report: Общий отчёт о запуске. По умолчанию отчёт создаётся по RUN_REPORT_PATH
+            и сохраняется в конце build_sowa_schemes.
+        :param is_bulk_run: Режим массового запуска: сообщения по каждому запросу и файлу схемы выводятся
+            на уровне DEBUG, вместо них выводятся итоги по файлам дампов и эндпоинтам и периодическая строка прогресса.
 
         """
         self.is_from_har = is_from_har
         self.is_from_api = is_from_api
+        self.is_har_streaming = is_har_streaming
+        self.workers = workers
+        self.entries_chunk_size = entries_chunk_size
 
         self.dump_files_list = []
         if self.is_from_har:
@@ -46,9 +79,65 @@ class SOWASchemesGenerator:
 
         self.path_to_schemes_dir = config_json.get("JSON_SCHEMES_DIR")
         self.variables = config_json.get("VARIABLES")
+        JSONCodec.use(self.variables.get("json_codec", "auto"))
+        self.schema_options = SchemaOptions(self.variables["json_schema_options"])
+        # Одинаковые поддеревья схем хранятся одним общим узлом
+        self.schema_interner = SchemaInterner()
         self.replace_patterns = config_json.get("REPLACE_PATTERNS")
+        self.path_rewriter = PathRewriter(replace_patterns=self.replace_patterns,
+                                          cache_size=self.variables.get("path_rewriter_cache_size", 4096))
 
+        # Счётчики генерации, в пуле процессов собираются из процессов после обработки каждой порции
+        self.counters = Counter()
+
+        self.is_run_report_owner = run_report is None
+        self.run_report = RunReport.from_config(config_json) if run_report is None else run_report
+
+        self.is_bulk_run = is_bulk_run
+        self.entry_log_level = "DEBUG" if is_bulk_run else "INFO"
+        self.progress_reporter = ProgressReporter(
+            interval_seconds=self.variables.get("progress_interval_seconds", 10) if is_bulk_run else 0)
+
+        if skip_frames_list is None:
+            skip_frames_list = config_json.get("SKIP_FRAMES_LIST", [])
         self.skip_frames_list = skip_frames_list
+        self.har_entry_filter = HarEntryFilter(content_types=self.variables["content_types"],
+                                               skip_methods=self.variables.get("skip_methods", []),
+                                               skip_frames_list=self.skip_frames_list)
+
+        self.schema_writer = SchemaWriter(path_to_index=config_json.get("SCHEMES_INDEX_PATH"),
+                                          workers=self.variables.get("schemes_writer_workers", 4),
+                                          files_log_level=self.entry_log_level)
+
+        self.schema_cache = None
+        if use_schema_cache and config_json.get("SCHEMES_CACHE_PATH"):
+            self.schema_cache = SchemaCache(path_to_cache=config_json.get("SCHEMES_CACHE_PATH"),
+                                            options=self.variables["json_schema_options"],
+                                            max_size_mb=self.variables.get("schemes_cache_max_size_mb", 512))
+
+        self.build_manifest = None
+        if is_incremental:
+            self.build_manifest = BuildManifest(path_to_manifest=config_json.get("BUILD_MANIFEST_PATH"),
+                                                build_settings=self.get_build_settings())
+
+    def get_build_settings(self) -> dict:
+        """Получение настроек, от которых зависят сгенерированные схемы.
+
+        Количество процессов, повторы запросов, прогресс, отчёт и расположение кэша на схемы не влияют, поэтому
+        их изменение не делает манифест сборки недействительным.
+
+        :return: Режим чтения дампов, фильтры запросов, замены путей и параметры генерации схем.
+
+        """
+        return {
+            "is_from_har": self.is_from_har,
+            "is_from_api": self.is_from_api,
+            "content_types": self.variables["content_types"],
+            "skip_methods": self.variables.get("skip_methods", []),
+            "json_schema_options": self.variables["json_schema_options"],
+            "replace_patterns": self.replace_patterns,
+            "skip_frames_list": self.skip_frames_list
+        }
 
     @staticmethod
     def read_dump_file(path_to_dump_file: str, as_json: bool = False) -> dict:
@@ -63,13 +152,13 @@ class SOWASchemesGenerator:
             file_data = file.read()
 
             if as_json:
-                return json.loads(file_data)
+                return JSONCodec.loads(file_data)
             else:
                 return file_data
 
     @staticmethod
-    def create_schema_dir(path_to_schema: str, path_to_schemes_dir: str) -> str:
-        """Создание для сохранение схем.
+    def get_schema_dir(path_to_schema: str, path_to_schemes_dir: str) -> str:
+        """Получение каталога для сохранения схем. Каталог создаётся при записи схем в SchemaWriter.
 
         :param path_to_schema: Относительный путь к схеме.
         :param path_to_schemes_dir: Основной каталог для схем.
@@ -77,11 +166,7 @@ class SOWASchemesGenerator:
 
         """
         normalized_path = os.path.splitext(os.path.join(*path_to_schema.split("/")))[0]
-        path_to_schema = os.path.abspath(os.path.join(path_to_schemes_dir, normalized_path))
-        os.makedirs(path_to_schema, exist_ok=True)
-        logger.info(f"Создание директории для сохранения схем: {path_to_schema[path_to_schema.find('schemes')::]}")
-
-        return path_to_schema
+        return os.path.abspath(os.path.join(path_to_schemes_dir, normalized_path))
 
     def set_path_to_schema(self, frame: dict) -> dict:
         """Установка путей к схемам для каждого этапа кадра.
@@ -90,18 +175,20 @@ class SOWASchemesGenerator:
         :return: Кадр с установленными путями к схемам.
 
         """
+        api_path = f'{frame["api_path"].split("/")[-1]}/'
+        absolute_schema_dir_path = self.get_schema_dir(path_to_schema=api_path,
+                                                       path_to_schemes_dir=self.path_to_schemes_dir)
+
         for stage, schemas in frame["schemes"].items():
             for method, schema in schemas.items():
-                api_path = f'{frame["api_path"].split("/")[-1]}/'
-
                 relative_schema_path = "/".join(
                     ["".join([self.path_to_schemes_dir, os.path.splitext(api_path)[0]]), f"{stage}.json"]
                 )
 
-                absolute_schema_dir_path = self.create_schema_dir(path_to_schema=api_path,
-                                                                  path_to_schemes_dir=self.path_to_schemes_dir)
                 absolute_schema_path = os.path.join(absolute_schema_dir_path, f"{stage}.json")
-                logger.info(f"Файл для сохранения: {absolute_schema_path[absolute_schema_path.find('schemes')::]}")
+                # Путь для сообщения вычисляется, только если уровень сообщения включён
+                logger.opt(lazy=True).log(self.entry_log_level, "Файл для сохранения: {}",
+                                          lambda: absolute_schema_path[absolute_schema_path.find("schemes")::])
 
                 frame["schemes"][stage][method] = {}
 
@@ -111,101 +198,376 @@ class SOWASchemesGenerator:
 
         return frame
 
-    def convert_payload_to_schema(self, payload_type: str, payload: str) -> Optional[str]:
+    def convert_payload_to_schema(self, payload_type: str, payload: Any) -> Optional[dict]:
         """Конвертирование полезной нагрузки кадра в JSON схему.
 
-        :param payload_type: Тип данных кадра.
+        Полезная нагрузка декодируется не более одного раза: строка или байты JSON разбираются
+        при payload_type="json_data", уже декодированный объект передаётся при payload_type="object".
+
+        :param payload_type: Тип данных кадра: "json_data" или "object".
         :param payload: Полезная нагрузка кадра.
-        :return: JSON схема или None, если конвертация невозможна.
+        :return: JSON схема в виде словаря или None, если конвертация невозможна.
 
         """
 
-        if payload_type == "json_data":
-            if len(payload) == 0:
-                payload = json.dumps({})
+        if payload_type not in ("json_data", "object"):
+            return None
 
+        # Неизменившаяся полезная нагрузка берётся из кэша без генерации схемы
+        cache_key = None
+        if self.schema_cache is not None:
+            cache_key = self.schema_cache.make_key(payload_type=payload_type, payload=payload)
+            cached = self.schema_cache.get(key=cache_key)
+            if cached is not None:
+                json_schema, skipped_array_items = cached
+                # Пропущенные при выборке элементы учитываются так же, как при генерации схемы
+                if skipped_array_items:
+                    self.counters["skipped_array_items"] += skipped_array_items
+                return self.schema_interner.intern(json_schema)
+
+        if payload_type == "json_data" and len(payload) > 0:
             request_schema_generator = Recorder.from_str(payload)
-            json_schema = request_schema_generator.generator.to_json(self.variables["json_schema_options"])
-            return json_schema
+        elif payload_type == "json_data":
+            request_schema_generator = Recorder.from_object({})
         else:
-            return None
+            request_schema_generator = Recorder.from_object(payload)
+
+        json_schema = request_schema_generator.generator.to_dict(options=self.schema_options)
+        skipped_array_items = request_schema_generator.generator.skipped_array_items
+        if skipped_array_items:
+            self.counters["skipped_array_items"] += skipped_array_items
+
+        if cache_key is not None:
+            self.schema_cache.put(key=cache_key, schema=json_schema, skipped_array_items=skipped_array_items)
 
-    def str_replace(self, string: str, replace_method: str) -> str:
-        """Замена подстрок в строке согласно заданному шаблону.
+        return self.schema_interner.intern(json_schema)
 
-        :param string: Исходная строка.
-        :param replace_method: Метод замены, описанный в replace_patterns.
-        :return: Строка после замены.
+    def build_sowa_schemes(self, entries: Optional[Iterable[dict]] = None):
+        """Точка входа для генератора
+
+        :param entries: Запросы, полученные не из файлов дампов, например ответы API по мере их получения.
+            По умолчанию запросы читаются из файлов дампов.
 
         """
-        for replace in self.replace_patterns[replace_method]:
-            string = re.sub(
-                replace["pattern"],
-                replace["replace"],
-                string
-            )
-
-        return string
-
-    def build_sowa_schemes(self):
-        """Точка входа для генератора"""
-        # Получение списка запросов из дампов
+        self.progress_reporter.start(
+            total_bytes=None if entries is not None else sum(map(os.path.getsize, self.dump_files_list)))
+
+        if entries is not None:
+            logger.debug(f"Вызов метода build_frames_from_entries")
+            merged_frames = self.build_frames_from_entries(entries=self.run_report.iter_stage("receive_entries",
+                                                                                              entries))
+        elif self.build_manifest is not None:
+            # Обработка только новых и изменившихся файлов
+            logger.debug(f"Вызов метода build_frames_incrementally")
+            merged_frames = self.build_frames_incrementally()
+        else:
+            logger.debug(f"Вызов метода build_frames")
+            merged_frames = self.build_frames(dump_files_list=self.dump_files_list)
+
+        # Сохранение каждой схемы в директорию одним пакетом
+        with self.run_report.stage("write_schema"):
+            for frame_name, frame in merged_frames.items():
+                logger.debug(f"Вызов метода set_path_to_schema")
+                frame = self.set_path_to_schema(frame=frame)
+                logger.debug(f"Вызов метода write_schema")
+                SOWASchemesGenerator.write_schema(frame=frame, schema_writer=self.schema_writer)
+            self.schema_writer.flush()
+
+        if self.build_manifest is not None:
+            self.build_manifest.save()
+        elif self.is_from_har and entries is None:
+            # Срабатывания шаблонов показательны только после чтения всех файлов дампов
+            self.path_rewriter.log_hits()
+
+        logger.debug(f"Уникальных узлов схем: {len(self.schema_interner)}")
+
+        if self.is_bulk_run:
+            self.progress_reporter.log_summary()
+            for frame_name in merged_frames:
+                logger.info(f"Эндпоинт {frame_name}: запросов {self.counters[('frame_entries', frame_name)]}")
+
+        if self.counters["skipped_array_items"]:
+            logger.info(f"Пропущено элементов массивов при выборке: {self.counters['skipped_array_items']}")
+
+        if self.schema_cache is not None:
+            self.schema_cache.close()
+
+        if self.is_run_report_owner:
+            self.run_report.save()
+
+    def build_frames(self, dump_files_list: List[str], executor: Optional[ProcessPoolExecutor] = None) -> dict:
+        """Получение объединённых кадров из файлов дампов.
+
+        :param dump_files_list: Список файлов дампов.
+        :param executor: Пул процессов, общий для нескольких вызовов. По умолчанию пул создаётся на вызов.
+        :return: Объединённые кадры запросов.
+
+        """
+        # Получение запросов из дампов. Запросы, кадры и их объединение обрабатываются потоково,
+        # поэтому в памяти не держится весь дамп целиком
         logger.debug(f"Вызов метода parse_dump_file, получение entries")
-        entries = self.parse_dump_file()
+        entries = self.run_report.iter_stage("parse_dump_file", self.parse_dump_file(dump_files_list=dump_files_list))
+
+        return self.build_frames_from_entries(entries=entries, executor=executor)
+
+    def build_frames_from_entries(self,
+                                  entries: Iterable[dict],
+                                  executor: Optional[ProcessPoolExecutor] = None) -> dict:
+        """Получение объединённых кадров из запросов.
+
+        :param entries: Запросы в формате parse_dump_file.
+        :param executor: Пул процессов, общий для нескольких вызовов. По умолчанию пул создаётся на вызов.
+        :return: Объединённые кадры запросов.
+
+        """
+        entries = self.progress_reporter.iter_entries(entries)
 
-        # Получение списка кадров для каждого запроса
+        if self.workers > 1:
+            # Генерация схем порциями запросов в пуле процессов с последующим объединением
+            logger.debug(f"Вызов метода build_frames_in_pool, процессов: {self.workers}")
+            return self.build_frames_in_pool(entries=entries, executor=executor)
+
+        # Получение кадров для каждого запроса
         logger.debug(f"Вызов метода get_frames, получение frames")
-        frames = self.get_frames(entries=entries)
+        frames = self.run_report.iter_stage("get_frames", self.get_frames(entries=entries))
 
         # Объединение кадров запросов по методу и адресу
         logger.debug(f"Вызов метода merge_frames, получение merged_frames")
-        merged_frames = self.merge_frames(frames=frames)
+        with self.run_report.stage("merge_frames"):
+            return self.merge_frames(frames=frames)
+
+    def build_frames_incrementally(self) -> dict:
+        """Получение объединённых кадров эндпоинтов, затронутых новыми, изменившимися или удалёнными файлами.
+
+        Кадры неизменившихся файлов берутся из манифеста. Итоговые кадры затронутых эндпоинтов объединяются
+        из кадров всех файлов в порядке файлов, поэтому совпадают с результатом полной сборки.
+
+        :return: Объединённые кадры затронутых эндпоинтов.
+
+        """
+        self.build_manifest.load()
+
+        files_frames = []
+        affected_frame_names = set()
+        changed_files_count = 0
+
+        # Один пул процессов на все изменившиеся файлы, процессы запускаются при первой порции запросов
+        with ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else nullcontext() as executor:
+            for path_to_dump_file in self.dump_files_list:
+                file_frames = self.build_manifest.get_unchanged_frames(path_to_file=path_to_dump_file)
+
+                if file_frames is not None:
+                    # Неизменившийся файл не читается и не учитывается в оценке оставшегося времени
+                    self.progress_reporter.skip_file(size_bytes=os.path.getsize(path_to_dump_file))
+                else:
+                    changed_files_count += 1
+                    previous_file_frames = self.build_manifest.get_frames(path_to_file=path_to_dump_file)
+                    file_frames = self.build_frames(dump_files_list=[path_to_dump_file], executor=executor)
+
+                    affected_frame_names.update(previous_file_frames.keys(), file_frames.keys())
+                    self.build_manifest.update(path_to_file=path_to_dump_file, frames=file_frames)
+
+                files_frames.append(file_frames)
+
+        removed_files = self.build_manifest.remove_missing(paths_to_files=self.dump_files_list)
+        for record in removed_files.values():
+            affected_frame_names.update(record["frames"].keys())
+
+        logger.info(f"Изменившихся файлов: {changed_files_count}, удалённых файлов: {len(removed_files)}, "
+                    f"затронутых эндпоинтов: {len(affected_frame_names)}")
+
+        merged_frames = {}
+        with self.run_report.stage("merge_frames"):
+            for file_frames in files_frames:
+                for frame_name, frame in file_frames.items():
+                    if frame_name in affected_frame_names:
+                        # Объединение изменяет кадры на месте, а кадры в манифесте должны остаться неизменными:
+                        # контейнеры кадра копируются, а схемы интернируются и копируются только при изменении
+                        frame = {**frame,
+                                 "schemes": {stage: dict(schemas) for stage, schemas in frame["schemes"].items()}}
+                        self.intern_frame(frame=frame)
+                        SOWASchemesGenerator.merge_frame(merged_frames=merged_frames,
+                                                         frame=frame,
+                                                         schema_interner=self.schema_interner)
+
+        return merged_frames
+
+    def build_merged_frames(self, entries: list) -> tuple[dict, Counter]:
+        """Получение объединённых кадров для порции запросов. Выполняется в процессе пула.
+
+        :param entries: Порция запросов.
+        :return: Объединённые кадры порции и счётчики генерации порции.
+
+        """
+        # Процесс пула может быть запущен без копирования состояния родителя
+        JSONCodec.use(self.variables.get("json_codec", "auto"))
+        self.counters = Counter()
+        self.run_report.reset()
+
+        frames = self.run_report.iter_stage("get_frames", self.get_frames(entries=entries))
+        with self.run_report.stage("merge_frames"):
+            merged_frames = self.merge_frames(frames=frames)
 
-        # Сохранение каждой схемы в директорию
-        for frame_name, frame in merged_frames.items():
-            logger.debug(f"Вызов метода set_path_to_schema")
-            frame = self.set_path_to_schema(frame=frame)
-            logger.debug(f"Вызов метода write_schema")
-            SOWASchemesGenerator.write_schema(frame=frame)
+        if self.schema_cache is not None:
+            self.schema_cache.flush()
 
-    def parse_dump_file(self) -> list:
-        """Разбор файлов дампов для получения списка запросов.
+        # Итоги отчёта о запуске передаются вместе со счётчиками
+        self.counters.update(self.run_report.export())
+        return merged_frames, self.counters
 
-        :return: Список запросов.
+    def build_frames_in_pool(self, entries: Iterable[dict], executor: Optional[ProcessPoolExecutor] = None) -> dict:
+        """Генерация и объединение кадров порциями запросов в пуле процессов.
+
+        Порции объединяются в порядке чтения запросов, поэтому результат совпадает с последовательной генерацией.
+        Количество порций в обработке ограничено, чтобы не держать в памяти весь дамп. Порция, которую
+        не удалось передать в процесс пула или получить из него из-за глубины вложенности, обрабатывается
+        в основном процессе.
+
+        :param entries: Запросы.
+        :param executor: Пул процессов, общий для нескольких вызовов. По умолчанию пул создаётся на вызов.
+        :return: Объединённые кадры запросов.
+
+        """
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                return self.build_frames_in_pool(entries=entries, executor=executor)
+
+        merged_frames = {}
+        entries = iter(entries)
+        pending = deque()
+
+        while True:
+            entries_chunk = list(islice(entries, self.entries_chunk_size))
+            if entries_chunk:
+                pending.append((entries_chunk, executor.submit(self.build_merged_frames, entries_chunk)))
+
+            if pending and (not entries_chunk or len(pending) >= self.workers * 2):
+                submitted_chunk, future = pending.popleft()
+                try:
+                    chunk_merged_frames, chunk_counters = future.result()
+                except RecursionError:
+                    # pickle сериализует рекурсивно, поэтому запросы и схемы глубже предела рекурсии не передаются
+                    # между процессами. Такая порция обрабатывается здесь копией генератора, как в процессе пула
+                    logger.warning(f"Порция из {len(submitted_chunk)} запросов слишком глубоко вложена "
+                                   f"для передачи в процесс пула, обработка в основном процессе")
+                    chunk_merged_frames, chunk_counters = pickle.loads(pickle.dumps(self)).build_merged_frames(
+                        submitted_chunk)
+                self.run_report.absorb(counters=chunk_counters)
+                self.counters.update(chunk_counters)
+                with self.run_report.stage("merge_frames"):
+                    for frame in chunk_merged_frames.values():
+                        # Общие узлы не сохраняются при передаче из процесса, схемы интернируются заново
+                        self.intern_frame(frame=frame)
+                        SOWASchemesGenerator.merge_frame(merged_frames=merged_frames,
+                                                         frame=frame,
+                                                         schema_interner=self.schema_interner)
+
+            if not entries_chunk and not pending:
+                break
+
+        return merged_frames
+
+    @staticmethod
+    def iter_har_entries(path_to_dump_file: str,
+                         progress_reporter: Optional[ProgressReporter] = None) -> Iterator[dict]:
+        """Потоковое чтение записей log.entries из .har файла.
+
+        В памяти одновременно находится только одна запись, а не весь файл.
+
+        :param path_to_dump_file: Путь к .har файлу.
+        :param progress_reporter: Строка прогресса, которой передаётся позиция чтения файла.
+        :return: Генератор записей .har файла.
+
+        """
+        with open(path_to_dump_file, "r", encoding="UTF-8") as file:
+            if progress_reporter is not None:
+                progress_reporter.track_file(file=file.buffer)
+            yield from JSONStreamReader(file).iter_items("log", "entries")
+
+    def parse_dump_file(self, dump_files_list: Optional[List[str]] = None) -> Iterator[dict]:
+        """Разбор файлов дампов для получения запросов.
+
+        Время файла в отчёте о запуске включает обработку его запросов, так как запросы обрабатываются потоково.
+
+        :param dump_files_list: Список файлов дампов. По умолчанию все найденные файлы.
+        :return: Генератор запросов.
 
         """
-        entries = []
+        if dump_files_list is None:
+            dump_files_list = self.dump_files_list
 
-        for path_to_dump_file in self.dump_files_list:
+        for path_to_dump_file in dump_files_list:
 
-            logger.info(f"Парсинг файла: {path_to_dump_file}")
+            logger.log(self.entry_log_level, "Парсинг файла: {}", path_to_dump_file)
+            file_started_at = time.perf_counter()
+            size_bytes = os.path.getsize(path_to_dump_file)
 
             if os.path.splitext(path_to_dump_file)[1] == ".har":
-                dump_data = self.read_dump_file(path_to_dump_file=path_to_dump_file, as_json=True)
-                har_parser_instance = HarParser(dump_data)
+                file_measure = self.run_report.measure()
+                if self.is_har_streaming:
+                    har_entries = self.iter_har_entries(path_to_dump_file=path_to_dump_file,
+                                                        progress_reporter=self.progress_reporter)
+                else:
+                    # haralyzer нужен только для чтения .har файла целиком, поэтому импортируется здесь
+                    from haralyzer import HarParser
+
+                    dump_data = self.read_dump_file(path_to_dump_file=path_to_dump_file, as_json=True)
+                    har_entries = HarParser(dump_data).har_data["entries"]
+
+                # Записи отбираются по метаданным до разбора тел, тела ненужных записей не хранятся
+                entries_count = 0
+                for entry in har_entries:
+                    if self.har_entry_filter.get_skip_reason(entry=entry) is not None:
+                        continue
+
+                    # Преобразование URL адреса и базового пути к схеме
+                    url, api_path = self.path_rewriter.rewrite(path=urlparse(entry["request"]["url"]).path)
+                    if self.har_entry_filter.get_skip_reason_by_path(api_path=api_path) is not None:
+                        continue
+
+                    entry = self.har_entry_filter.strip_non_json_bodies(entry=entry)
+                    entries_count += 1
+                    yield {"type": "har", "url": url, "api_path": api_path, "package": entry}
 
-                for entry in har_parser_instance.har_data["entries"]:
-                    request_url = entry["request"]["url"]
-                    api_path = urlparse(request_url).path
+                file_wall_seconds = time.perf_counter() - file_started_at
+                self.har_entry_filter.log_skipped(path_to_dump_file=path_to_dump_file)
+                self.run_report.add("dump_files", path_to_dump_file,
+                                    measure=file_measure,
+                                    entries=entries_count,
+                                    wall_seconds=file_wall_seconds,
+                                    size_bytes=size_bytes)
+                self.progress_reporter.finish_file(size_bytes=size_bytes)
 
-                    if entry["_resourceType"] == "xhr":
-                        entries.append({"type": "har", "api_path": api_path, "package": entry})
+                if self.is_bulk_run:
+                    logger.info(f"Файл {path_to_dump_file}: запросов {entries_count} за {file_wall_seconds:.2f} с")
 
             elif os.path.splitext(path_to_dump_file)[1] == ".json":
-                dump_data = self.read_dump_file(path_to_dump_file=path_to_dump_file)
-                api_dict = jsonref.JsonRef.replace_refs(json.loads(json.dumps(jsonref.loads(dump_data), default=dict)))
                 path_to_dump_file = path_to_dump_file.replace("\\", "/")
                 api_path = path_to_dump_file.split("/")[3]
+
+                frame_name = HarEntryFilter.get_frame_name(resource_type="fetch", api_path=f"/api/v2/{api_path}")
+                if frame_name in self.skip_frames_list:
+                    logger.info(f"Пропуск файла {path_to_dump_file}: кадр {frame_name} в SKIP_FRAMES_LIST")
+                    self.progress_reporter.finish_file(size_bytes=size_bytes)
+                    continue
+
+                file_measure = self.run_report.measure()
+                dump_data = self.read_dump_file(path_to_dump_file=path_to_dump_file)
+                api_dict = RefResolver.loads(dump_data=dump_data)
                 dump_file_name = path_to_dump_file[(path_to_dump_file.find("dumps"))::]
-                entries.append({"type": "api", "api_path": api_path, "dump_file_name": dump_file_name,
-                                "package": api_dict})
+                yield {"type": "api", "api_path": api_path, "dump_file_name": dump_file_name, "package": api_dict}
 
-            else:
-                continue
+                self.run_report.add("dump_files", path_to_dump_file,
+                                    measure=file_measure,
+                                    entries=1,
+                                    wall_seconds=time.perf_counter() - file_started_at,
+                                    size_bytes=size_bytes)
+                self.progress_reporter.finish_file(size_bytes=size_bytes)
 
-        return entries
+            else:
+                self.progress_reporter.finish_file(size_bytes=size_bytes)
 
-    def get_frames(self, entries: list) -> list:
+    def get_frames(self, entries: Iterable[dict]) -> Iterator[dict]:
         """Получение списка кадров запроса со схемами
         {
             'type': resource_type,
@@ -219,21 +581,21 @@ class SOWASchemesGenerator:
                 }
         }
 
-        :param entries: Список запросов
-        :return: Список кадров со схемами
+        :param entries: Запросы
+        :return: Генератор кадров со схемами
 
         """
-        frames = []
-
         if self.is_from_har:
 
             for entry in entries:
+                entry_started_at = time.perf_counter()
+                entry_measure = self.run_report.measure()
 
-                # Преобразование URL адреса и базового пути к схеме
-                url = self.str_replace(string=entry["api_path"], replace_method="url")
-                api_path = self.str_replace(string=entry["api_path"], replace_method="api_path")
+                url = entry["url"]
+                api_path = entry["api_path"]
 
-                logger.info(f"URL: {api_path}")
+                # Сообщение по каждому запросу форматируется, только если его уровень включён
+                logger.log(self.entry_log_level, "URL: {}", api_path)
 
                 request_schemas = []
                 response_schemas = []
@@ -245,27 +607,19 @@ class SOWASchemesGenerator:
                         resource_type = entry["package"]["_resourceType"]
 
                     method = entry["package"]["request"]["method"].lower()
-                    response_content_type = ""
-
-                    for header in entry["package"]["response"]["headers"]:
-                        if header["name"] == "Content-Type":
-                            response_content_type = header["value"]
-
-                    name_with_extension = os.path.splitext(api_path[1::])
-                    if name_with_extension[1] != "":
-                        # Если это файл с расширением - пропуск записи, тк это статика, она не описывается схемой
-                        continue
+                    response_content_type = HarEntryFilter.get_response_content_type(entry=entry["package"])
 
                     # Для HTTP записи
                     if resource_type == "fetch" and response_content_type in self.variables["content_types"]:
-                        # Получение тела запроса
+                        # Получение тела запроса. Текст тела разбирается как JSON один раз,
+                        # при ошибке разбора схема строится для пустого объекта
                         try:
-                            request_json_str = json.dumps(entry["package"]["request"]["postData"]["text"])
+                            request_payload = entry["package"]["request"]["postData"]["text"]
                         except KeyError:
-                            request_json_str = ""
+                            request_payload = {}
 
-                        request_schema = self.convert_payload_to_schema(payload_type="json_data",
-                                                                        payload=request_json_str)
+                        request_schema = self.convert_payload_to_schema(payload_type="object",
+                                                                        payload=request_payload)
                         request_schemas.append(request_schema)
 
                         # Получение тела ответа
@@ -278,25 +632,29 @@ class SOWASchemesGenerator:
                                                                          payload=response_json_str)
                         response_schemas.append(response_schema)
 
-                    frames.append(
-                        {
-                            "type": resource_type,
-                            "method": method,
-                            "url": url,
-                            "api_path": api_path,
-                            "schemes":
-                                {
-                                    "request": request_schemas,
-                                    "response": response_schemas
-                                }
-                        }
-                    )
+                    self.run_report.add("endpoints", api_path,
+                                        measure=entry_measure,
+                                        entries=1,
+                                        wall_seconds=time.perf_counter() - entry_started_at)
+                    yield {
+                        "type": resource_type,
+                        "method": method,
+                        "url": url,
+                        "api_path": api_path,
+                        "schemes":
+                            {
+                                "request": request_schemas,
+                                "response": response_schemas
+                            }
+                    }
         elif self.is_from_api:
             for entry in entries:
+                entry_started_at = time.perf_counter()
+                entry_measure = self.run_report.measure()
                 url = "/api/v2/" + entry.get("api_path")
                 api_path = url
 
-                logger.info(f"Создание схемы для файла: {entry['dump_file_name']}")
+                logger.log(self.entry_log_level, "Создание схемы для файла: {}", entry["dump_file_name"])
 
                 request_schemas = []
                 response_schemas = []
@@ -304,17 +662,19 @@ class SOWASchemesGenerator:
 
                 method = "get"
 
-                request_json_str = ""
-                request_schema = self.convert_payload_to_schema(payload_type="json_data",
-                                                                payload=request_json_str)
+                request_schema = self.convert_payload_to_schema(payload_type="object", payload={})
                 request_schemas.append(request_schema)
 
-                response_json_str = json.dumps(entry.get("package"), ensure_ascii=False)
-                response_schema = self.convert_payload_to_schema(payload_type="json_data",
-                                                                 payload=response_json_str)
+                # Ответ уже декодирован при чтении дампа, повторная сериализация не нужна
+                response_schema = self.convert_payload_to_schema(payload_type="object",
+                                                                 payload=entry.get("package"))
                 response_schemas.append(response_schema)
 
-                frames.append({
+                self.run_report.add("endpoints", api_path,
+                                    measure=entry_measure,
+                                    entries=1,
+                                    wall_seconds=time.perf_counter() - entry_started_at)
+                yield {
                     "type": resource_type,
                     "method": method,
                     "url": url,
@@ -324,14 +684,11 @@ class SOWASchemesGenerator:
                         "response": response_schemas
                     }
                 }
-                )
 
-        return frames
-
-    def merge_frames(self, frames: list) -> dict:
+    def merge_frames(self, frames: Iterable[dict]) -> dict:
         """Объединение кадров по методу и адресу запроса.
 
-        :param frames: Список кадров.
+        :param frames: Кадры.
         :return: Объединённые кадры запросов.
 
         """
@@ -341,44 +698,87 @@ class SOWASchemesGenerator:
             # Формирование имени объединенного кадра
             frame_name = f"{frame['type']}__{frame['api_path'][1::].replace('/', '_')}"
             frame["name"] = frame_name
+            self.counters[("frame_entries", frame_name)] += 1
 
             # Объединение схем текущего кадра
             for stage, schemas_list in frame["schemes"].items():
-                merged_schema = MergeJSONSchemes.merge_schemes_by_jsonmerge(schemes=frame["schemes"][stage])
-                frame["schemes"][stage] = {}
-                frame["schemes"][stage][frame["method"]] = merged_schema
-
-                # Если в списке объединенных кадров есть кадр с таким же именем,
-                # то объединение схем с объединенным кадром
-                if frame_name in merged_frames:
-                    if merged_frames[frame_name]["schemes"][stage].get(frame["method"]):
-                        merged_frames[frame_name]["schemes"][stage][
-                                frame["method"]] = MergeJSONSchemes.merge_schemes_by_jsonmerge(
-                                schemes=[frame["schemes"][stage][frame["method"]],
-                                         merged_frames[frame_name]["schemes"][stage][frame["method"]]
-                                         ]
-                            )
-                    else:
-                        merged_frames[frame_name]["schemes"][stage][frame["method"]] = merged_schema
+                merged_schema = {}
+                for schema in schemas_list:
+                    merged_schema = MergeJSONSchemes.merge_schemes_in_place(target=merged_schema,
+                                                                            source=schema,
+                                                                            schema_interner=self.schema_interner)
+                frame["schemes"][stage] = {frame["method"]: merged_schema}
 
-                else:
-                    # Если кадра нет в списке объединенных, то добавление кадра
-                    merged_frames[frame_name] = frame
+            SOWASchemesGenerator.merge_frame(merged_frames=merged_frames,
+                                             frame=frame,
+                                             schema_interner=self.schema_interner)
 
         return merged_frames
 
+    def intern_frame(self, frame: dict):
+        """Замена схем кадра каноническими узлами.
+
+        :param frame: Кадр, схемы которого уже сгруппированы по методу запроса. Изменяется на месте.
+
+        """
+        for schemas in frame["schemes"].values():
+            for method, schema in schemas.items():
+                schemas[method] = self.schema_interner.intern(schema)
+
+    @staticmethod
+    def merge_frame(merged_frames: dict, frame: dict, schema_interner: Optional[SchemaInterner] = None):
+        """Добавление кадра с объединёнными схемами в объединённые кадры.
+
+        :param merged_frames: Объединённые кадры, изменяются на месте.
+        :param frame: Кадр, схемы которого уже сгруппированы по методу запроса.
+        :param schema_interner: Хранилище канонических узлов, которые копируются перед изменением.
+
+        """
+        frame_name = frame["name"]
+
+        if frame_name not in merged_frames:
+            # Если кадра нет в списке объединенных, то добавление кадра
+            merged_frames[frame_name] = frame
+        else:
+            SOWASchemesGenerator._merge_frame_schemes(merged_schemes=merged_frames[frame_name]["schemes"],
+                                                      frame=frame,
+                                                      schema_interner=schema_interner)
+
+        # Узлы схем, уже объединённых в накопленные, больше не нужны хранилищу
+        if schema_interner is not None:
+            schema_interner.prune()
+
+    @staticmethod
+    def _merge_frame_schemes(merged_schemes: dict, frame: dict, schema_interner: Optional[SchemaInterner] = None):
+        """Объединение схем кадра со схемами объединённого кадра на месте.
+
+        :param merged_schemes: Схемы объединённого кадра, изменяются на месте.
+        :param frame: Кадр, схемы которого уже сгруппированы по методу запроса.
+        :param schema_interner: Хранилище канонических узлов, которые копируются перед изменением.
+
+        """
+        # Если в списке объединенных кадров есть кадр с таким же именем,
+        # то объединение схем с объединенным кадром на месте
+        for stage, schemas in frame["schemes"].items():
+            merged_schemas = merged_schemes[stage]
+
+            for method, schema in schemas.items():
+                if method in merged_schemas:
+                    # Накопленная схема дополняется схемой нового кадра
+                    merged_schemas[method] = MergeJSONSchemes.merge_schemes_in_place(target=merged_schemas[method],
+                                                                                     source=schema,
+                                                                                     schema_interner=schema_interner)
+                else:
+                    merged_schemas[method] = schema
+
     @staticmethod
-    def write_schema(frame: dict):
-        """Запись схем в директорию со схемами
+    def write_schema(frame: dict, schema_writer: SchemaWriter):
+        """Добавление схем кадра в пакет записи. Схемы сериализуются в JSON только при записи, один раз.
 
         :param frame: Кадр запроса
+        :param schema_writer: Пакетная запись схем, файлы записываются при вызове flush.
 
         """
         for stage, schemas in frame["schemes"].items():
             for method, schema in schemas.items():
-                with open(schema["absolute_schema_path"], "w") as json_schema_file:
-                    logger.info(
-                        f"Сохранение файла: "
-                        f"{schema['absolute_schema_path'][(schema['absolute_schema_path'].find('schemes'))::]}")
-                    json_schema_file.write(schema["schema"])
-                    logger.info(f"Файл сохранен")
+                schema_writer.add(path_to_schema=schema["absolute_schema_path"], schema=schema["schema"])
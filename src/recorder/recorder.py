@@ -1,3 +1,5 @@
+from typing import Any
+
 from src.generator.generator import SchemaGenerator
 
 
@@ -22,3 +24,14 @@ class Recorder(object):
         """
         generator = SchemaGenerator.from_json(json_string)
         return cls(generator)
+
+    @classmethod
+    def from_object(cls, base_object: Any):
+        """Создает экземпляр класса на основе уже декодированного объекта.
+
+        :param base_object: Декодированные данные.
+        :return: Экземпляр класса `Recorder`.
+
+        """
+        generator = SchemaGenerator.from_object(base_object)
+        return cls(generator)
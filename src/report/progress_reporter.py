@@ -0,0 +1,141 @@
+import time
+from typing import Optional, Iterable, Iterator, BinaryIO
+
+from loguru import logger
+
+
+class ProgressReporter:
+    """Периодическая строка прогресса длительного запуска: количество запросов, запросов в секунду и оценка
+    оставшегося времени.
+
+    Время проверяется на каждом запросе, а строка формируется не чаще одного раза в interval_seconds,
+    поэтому стоимость учёта запроса - одно сравнение. Оставшееся время оценивается по прочитанным байтам
+    файлов дампов: по завершённым файлам и позиции чтения текущего файла. Если общий размер неизвестен,
+    например для ответов API, выводится только скорость.
+
+    """
+
+    def __init__(self, interval_seconds: float = 10.0):
+        """Конструктор класса.
+
+        :param interval_seconds: Интервал между строками прогресса в секундах. При 0 прогресс не выводится.
+
+        """
+        self.interval_seconds = interval_seconds
+        self.is_enabled = interval_seconds > 0
+        self.start()
+
+    def start(self, total_bytes: Optional[int] = None):
+        """Начало отсчёта.
+
+        :param total_bytes: Общий размер обрабатываемых файлов дампов в байтах, если известен.
+
+        """
+        self.total_bytes = total_bytes
+        self.entries = 0
+        self._done_bytes = 0
+        self._file = None
+        self._started_at = time.monotonic()
+        self._next_report_at = self._started_at + self.interval_seconds
+
+    def __getstate__(self) -> dict:
+        # Прогресс выводится только в родительском процессе, открытый файл в процессы пула не передаётся
+        state = self.__dict__.copy()
+        state["_file"] = None
+        return state
+
+    def track_file(self, file: BinaryIO):
+        """Отслеживание позиции чтения текущего файла дампа.
+
+        :param file: Бинарный поток файла, например buffer открытого текстового файла.
+
+        """
+        self._file = file
+
+    def finish_file(self, size_bytes: int):
+        """Завершение обработки файла дампа.
+
+        :param size_bytes: Размер файла в байтах.
+
+        """
+        self._file = None
+        self._done_bytes += size_bytes
+
+    def skip_file(self, size_bytes: int):
+        """Исключение файла дампа, который не обрабатывается, из общего размера.
+
+        :param size_bytes: Размер файла в байтах.
+
+        """
+        if self.total_bytes is not None:
+            self.total_bytes -= size_bytes
+
+    def get_position_bytes(self) -> int:
+        """Получение количества прочитанных байтов файлов дампов.
+
+        :return: Количество байтов.
+
+        """
+        position = self._done_bytes
+        if self._file is not None:
+            try:
+                position += self._file.tell()
+            except ValueError:
+                # Файл уже закрыт, его размер будет учтён в finish_file
+                pass
+        return position
+
+    def iter_entries(self, entries: Iterable[dict]) -> Iterator[dict]:
+        """Учёт запросов по мере их получения.
+
+        :param entries: Запросы.
+        :return: Итератор с теми же запросами.
+
+        """
+        if not self.is_enabled:
+            return iter(entries)
+        return self._iter_entries(entries=entries)
+
+    def _iter_entries(self, entries: Iterable[dict]) -> Iterator[dict]:
+        """Генератор запросов с выводом строки прогресса по истечении интервала.
+
+        :param entries: Запросы.
+        :return: Генератор запросов.
+
+        """
+        for entry in entries:
+            self.entries += 1
+            if time.monotonic() >= self._next_report_at:
+                self.log_progress()
+            yield entry
+
+    def log_progress(self):
+        """Вывод строки прогресса."""
+        now = time.monotonic()
+        self._next_report_at = now + self.interval_seconds
+        elapsed = now - self._started_at
+        entries_per_second = self.entries / elapsed if elapsed else 0.0
+
+        if not self.total_bytes:
+            logger.info(f"Обработано запросов: {self.entries}, {entries_per_second:.1f} запросов/с")
+            return
+
+        position = min(self.get_position_bytes(), self.total_bytes)
+        percent = position / self.total_bytes * 100
+        if position:
+            eta = f"{(self.total_bytes - position) * elapsed / position:.0f} с"
+        else:
+            eta = "неизвестно"
+
+        logger.info(f"Обработано запросов: {self.entries}, {entries_per_second:.1f} запросов/с, "
+                    f"прочитано {percent:.1f}% дампов, осталось ~{eta}")
+
+    def log_summary(self):
+        """Вывод итоговой строки прогресса."""
+        if not self.is_enabled:
+            return
+
+        elapsed = time.monotonic() - self._started_at
+        entries_per_second = self.entries / elapsed if elapsed else 0.0
+        logger.info(f"Всего обработано запросов: {self.entries} за {elapsed:.2f} с, "
+                    f"{entries_per_second:.1f} запросов/с")
@@ -0,0 +1,410 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional, Iterable, Iterator
+
+from loguru import logger
+
+from src.codec.codec import JSONCodec
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class RunReport:
+    """Отчёт о запуске: время и память по этапам, файлам дампов и эндпоинтам.
+
+    Для этапа считается собственное время (wall и CPU) без времени вложенных этапов, количество вызовов
+    и, при включённом tracemalloc, наибольший объём памяти, выделенной сверх занятой к началу этапа,
+    включая вложенные этапы. Этап задаётся блоком stage
+    или итератором iter_stage, время которого считается только внутри next, поэтому потоковые этапы
+    (чтение дампов, получение кадров, объединение) разделяются, хотя выполняются вперемешку.
+    Значения по файлам и эндпоинтам суммируются через add. Замер measure, переданный в add, добавляет время CPU
+    и, при включённом tracemalloc, пиковую память файла или эндпоинта, включая обработку его запросов.
+
+    Итоги процессов пула передаются в родительский процесс вместе со счётчиками генерации (export, absorb).
+    Время этапов в пуле суммируется по процессам. Пиковая память tracemalloc общая для потоков процесса,
+    поэтому при параллельных этапах в потоках она приблизительна. Профилирование cProfile выполняется
+    только в процессе и потоке, создавших отчёт.
+
+    """
+
+    _EXPORT_KEY = "run_report"
+
+    def __init__(self,
+                 path_to_report: Optional[str] = None,
+                 is_trace_memory: bool = False,
+                 profile_stage: Optional[str] = None):
+        """Конструктор класса.
+
+        :param path_to_report: Путь к JSON файлу отчёта. Если не задан, замеры не выполняются.
+        :param is_trace_memory: Замерять пиковую память этапов через tracemalloc. Замедляет генерацию.
+        :param profile_stage: Этап, выполнение которого профилируется cProfile.
+
+        """
+        self.path_to_report = path_to_report
+        self.is_enabled = bool(path_to_report)
+        self.is_trace_memory = self.is_enabled and is_trace_memory
+        self.profile_stage = profile_stage if self.is_enabled else None
+
+        self.totals = Counter()
+        self.peaks = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiler = None
+        self._profile_depth = 0
+        self.start()
+
+    @classmethod
+    def from_config(cls, config_json: dict) -> "RunReport":
+        """Создание отчёта по настройкам из config.json.
+
+        :param config_json: Конфигурация из config.json.
+        :return: Экземпляр класса `RunReport`.
+
+        """
+        variables = config_json.get("VARIABLES", {})
+        return cls(path_to_report=config_json.get("RUN_REPORT_PATH"),
+                   is_trace_memory=variables.get("run_report_trace_memory", False),
+                   profile_stage=variables.get("run_report_profile_stage") or None)
+
+    def __getstate__(self) -> dict:
+        # В процесс пула передаются только настройки, итоги процесса возвращаются через export
+        state = self.__dict__.copy()
+        state["totals"] = Counter()
+        state["peaks"] = Counter()
+        state["profile_stage"] = None
+        state["_lock"] = None
+        state["_local"] = None
+        state["_profiler"] = None
+        state["_profile_depth"] = 0
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self):
+        """Начало отсчёта времени запуска и трассировки памяти."""
+        self._started_at = time.perf_counter()
+        self._cpu_started_at = time.process_time()
+
+        if self.is_trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def reset(self):
+        """Сброс итогов, например перед обработкой порции запросов в процессе пула."""
+        self.totals = Counter()
+        self.peaks = Counter()
+        self.start()
+
+    def _get_stack(self) -> list:
+        """Получение стека выполняющихся этапов текущего потока.
+
+        :return: Стек этапов.
+
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _get_measures(self) -> list:
+        """Получение открытых замеров файлов и эндпоинтов текущего потока.
+
+        :return: Список замеров.
+
+        """
+        measures = getattr(self._local, "measures", None)
+        if measures is None:
+            measures = self._local.measures = []
+        return measures
+
+    def _reset_peak(self) -> int:
+        """Сброс пика tracemalloc. Пик до сброса учитывается в выполняющемся этапе и открытых замерах.
+
+        :return: Объём памяти, занятой на момент сброса.
+
+        """
+        memory, peak = tracemalloc.get_traced_memory()
+        stack = self._get_stack()
+        if stack:
+            stack[-1][5] = max(stack[-1][5], peak)
+        for measure in self._get_measures():
+            measure[1] = max(measure[1], peak)
+
+        tracemalloc.reset_peak()
+        return memory
+
+    def _enter_stage(self, name: str):
+        """Начало замера этапа.
+
+        :param name: Наименование этапа.
+
+        """
+        stack = self._get_stack()
+
+        memory_at_start = 0
+        if self.is_trace_memory:
+            memory_at_start = self._reset_peak()
+
+        # Этап: наименование, начало wall и CPU, время вложенных этапов wall и CPU, пиковая и начальная память
+        stack.append([name, time.perf_counter(), time.process_time(), 0.0, 0.0, memory_at_start, memory_at_start])
+
+        if name == self.profile_stage:
+            if self._profiler is None:
+                self._profiler = cProfile.Profile()
+            if self._profile_depth == 0:
+                self._profiler.enable()
+            self._profile_depth += 1
+
+    def _exit_stage(self, is_call: bool = True):
+        """Окончание замера этапа, собственное время этапа добавляется к итогам.
+
+        :param is_call: Учитывать ли замер в количестве вызовов. Не учитывается исчерпание итератора.
+
+        """
+        wall_finished_at = time.perf_counter()
+        cpu_finished_at = time.process_time()
+
+        stack = self._get_stack()
+        name, wall_started_at, cpu_started_at, children_wall, children_cpu, peak, memory_at_start = stack.pop()
+
+        if name == self.profile_stage:
+            self._profile_depth -= 1
+            if self._profile_depth == 0:
+                self._profiler.disable()
+
+        wall = wall_finished_at - wall_started_at
+        cpu = cpu_finished_at - cpu_started_at
+        if self.is_trace_memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+
+        with self._lock:
+            self.totals[("stages", name, "calls")] += is_call
+            self.totals[("stages", name, "wall_seconds")] += wall - children_wall
+            self.totals[("stages", name, "cpu_seconds")] += cpu - children_cpu
+            if self.is_trace_memory:
+                self.peaks[("stages", name, "peak_allocated_bytes")] = max(
+                    self.peaks[("stages", name, "peak_allocated_bytes")], peak - memory_at_start)
+
+        if stack:
+            stack[-1][3] += wall
+            stack[-1][4] += cpu
+            stack[-1][5] = max(stack[-1][5], peak)
+            if self.is_trace_memory:
+                self._reset_peak()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Замер блока кода как этапа.
+
+        :param name: Наименование этапа.
+
+        """
+        if not self.is_enabled:
+            yield
+            return
+
+        self._enter_stage(name)
+        try:
+            yield
+        finally:
+            self._exit_stage()
+
+    def iter_stage(self, name: str, iterable: Iterable) -> Iterator:
+        """Замер итератора как этапа: учитывается только время получения элементов.
+
+        :param name: Наименование этапа.
+        :param iterable: Итерируемый объект, например генератор запросов.
+        :return: Итератор с теми же элементами.
+
+        """
+        if not self.is_enabled:
+            return iter(iterable)
+        return self._iter_stage(name=name, iterable=iterable)
+
+    def _iter_stage(self, name: str, iterable: Iterable) -> Iterator:
+        """Генератор элементов с замером каждого вызова next.
+
+        :param name: Наименование этапа.
+        :param iterable: Итерируемый объект.
+        :return: Генератор элементов.
+
+        """
+        iterator = iter(iterable)
+        while True:
+            self._enter_stage(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._exit_stage(is_call=False)
+                return
+            except BaseException:
+                self._exit_stage()
+                raise
+            self._exit_stage()
+            yield item
+
+    def measure(self) -> Optional[list]:
+        """Начало замера файла дампа или эндпоинта для add.
+
+        :return: Замер: начало CPU, пиковая и начальная память. None, если замеры не выполняются.
+
+        """
+        if not self.is_enabled:
+            return None
+
+        memory_at_start = 0
+        if self.is_trace_memory:
+            memory_at_start = self._reset_peak()
+
+        measure = [time.process_time(), memory_at_start, memory_at_start]
+        self._get_measures().append(measure)
+        return measure
+
+    def add(self, section: str, name: str, measure: Optional[list] = None, **values: float):
+        """Добавление значений к итогам файла дампа, эндпоинта и т.п.
+
+        :param section: Раздел отчёта, например "dump_files" или "endpoints".
+        :param name: Наименование файла или эндпоинта.
+        :param measure: Замер, начатый measure. Время CPU суммируется, пиковая память берётся наибольшая.
+        :param values: Суммируемые значения.
+
+        """
+        if not self.is_enabled:
+            return
+
+        peak = None
+        if measure is not None:
+            values["cpu_seconds"] = time.process_time() - measure[0]
+            if self.is_trace_memory:
+                peak = max(measure[1], tracemalloc.get_traced_memory()[1]) - measure[2]
+
+            measures = self._get_measures()
+            for idx, open_measure in enumerate(measures):
+                if open_measure is measure:
+                    del measures[idx]
+                    break
+
+        with self._lock:
+            for key, value in values.items():
+                self.totals[(section, name, key)] += value
+            if peak is not None:
+                self.peaks[(section, name, "peak_allocated_bytes")] = max(
+                    self.peaks[(section, name, "peak_allocated_bytes")], peak)
+
+    def export(self) -> Counter:
+        """Итоги для передачи из процесса пула вместе со счётчиками генерации.
+
+        :return: Счётчики с итогами отчёта.
+
+        """
+        exported = Counter()
+        for kind, values in (("totals", self.totals), ("peaks", self.peaks)):
+            for key, value in values.items():
+                exported[(self._EXPORT_KEY, kind, *key)] = value
+        return exported
+
+    def absorb(self, counters: Counter):
+        """Добавление итогов процесса пула, итоги удаляются из счётчиков генерации.
+
+        :param counters: Счётчики генерации процесса пула.
+
+        """
+        exported_keys = [key for key in counters if isinstance(key, tuple) and key[0] == self._EXPORT_KEY]
+
+        with self._lock:
+            for exported_key in exported_keys:
+                value = counters.pop(exported_key)
+                kind, key = exported_key[1], exported_key[2:]
+                if kind == "totals":
+                    self.totals[key] += value
+                else:
+                    self.peaks[key] = max(self.peaks[key], value)
+
+    @staticmethod
+    def _get_max_rss_bytes() -> Optional[int]:
+        """Получение наибольшего объёма памяти процесса.
+
+        :return: Объём памяти в байтах или None, если недоступен.
+
+        """
+        if resource is None:
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    def get_report(self) -> dict:
+        """Получение отчёта.
+
+        :return: Отчёт в виде словаря.
+
+        """
+        wall = time.perf_counter() - self._started_at
+        sections = {}
+
+        with self._lock:
+            for (section, name, key), value in list(self.totals.items()) + list(self.peaks.items()):
+                sections.setdefault(section, {}).setdefault(name, {})[key] = value
+
+        for items in sections.values():
+            for values in items.values():
+                for count_key in ("entries", "calls", "requests"):
+                    if values.get(count_key) and values.get("wall_seconds"):
+                        values[f"{count_key}_per_second"] = values[count_key] / values["wall_seconds"]
+                        break
+
+        entries = self.totals[("stages", "get_frames", "calls")]
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "wall_seconds": wall,
+            "cpu_seconds": time.process_time() - self._cpu_started_at,
+            "max_rss_bytes": self._get_max_rss_bytes(),
+            "entries": entries,
+            "entries_per_second": entries / wall if wall else None,
+            **sections
+        }
+
+        if self.is_trace_memory:
+            report["peak_traced_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        if self._profiler is not None:
+            report["profile"] = self.get_path_to_profile()
+
+        return report
+
+    def get_path_to_profile(self) -> str:
+        """Путь к файлу профиля этапа profile_stage, рядом с файлом отчёта.
+
+        :return: Путь к файлу профиля.
+
+        """
+        return f"{os.path.splitext(self.path_to_report)[0]}_{self.profile_stage}.prof"
+
+    def save(self):
+        """Запись отчёта и профиля через временный файл."""
+        if not self.is_enabled:
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path_to_report)), exist_ok=True)
+
+        report = self.get_report()
+        if self._profiler is not None:
+            self._profiler.dump_stats(self.get_path_to_profile())
+
+        path_to_tmp_report = f"{self.path_to_report}.tmp"
+        with open(path_to_tmp_report, "w", encoding="UTF-8") as report_file:
+            JSONCodec.dump(report, report_file, ensure_ascii=False, indent=4)
+        os.replace(path_to_tmp_report, self.path_to_report)
+
+        logger.info(f"Отчёт о запуске сохранён: {self.path_to_report}, время: {report['wall_seconds']:.2f} с, "
+                    f"запросов: {report['entries']}")
@@ -1,10 +1,7 @@
 from typing import Any
 
-from src.configs.config import config_json
-
 
 class Type(object):
-    schema_version = config_json.get("VARIABLES").get("json_schema_options").get("schemaVersion")
     json_type = None
     id = None
     required = False
@@ -0,0 +1,16 @@
+import pytest
+
+from src.codec.codec import JSONCodec
+
+
+@pytest.fixture(params=JSONCodec.AVAILABLE_CODECS)
+def codec(request) -> str:
+    """Выбор каждого из установленных JSON кодеков, после теста восстанавливается прежний кодек.
+
+    :return: Наименование выбранного кодека.
+
+    """
+    previous_codec = JSONCodec.name
+    JSONCodec.use(request.param)
+    yield request.param
+    JSONCodec.use(previous_codec)
@@ -0,0 +1,109 @@
+import os
+
+from src.cache.build_manifest import BuildManifest
+
+SETTINGS = {"is_from_har": True, "json_schema_options": {"nullable": True}}
+FRAMES = {"fetch__api_v1_users": {"name": "fetch__api_v1_users", "schemes": {"response": {"get": {"type": "object"}}}}}
+
+
+def write_dump(path, content: bytes, mtime_ns: int = None):
+    """Запись файла дампа с заданным временем изменения.
+
+    :param path: Путь к файлу.
+    :param content: Содержимое файла.
+    :param mtime_ns: Время изменения в наносекундах. По умолчанию время записи.
+
+    """
+    path.write_bytes(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def saved_manifest(tmp_path, dump_files: list) -> BuildManifest:
+    """Манифест, в котором сохранены кадры файлов дампов, прочитанный заново с диска.
+
+    :param tmp_path: Временная директория теста.
+    :param dump_files: Пути к файлам дампов.
+    :return: Загруженный манифест.
+
+    """
+    manifest = BuildManifest(path_to_manifest=str(tmp_path / "manifest.json"), build_settings=SETTINGS)
+    for path in dump_files:
+        manifest.update(path_to_file=str(path), frames=FRAMES)
+    manifest.save()
+
+    manifest = BuildManifest(path_to_manifest=str(tmp_path / "manifest.json"), build_settings=SETTINGS)
+    manifest.load()
+    return manifest
+
+
+def test_missing_manifest_has_no_files(tmp_path):
+    """Без файла манифеста все файлы дампов считаются новыми."""
+    dump = tmp_path / "a.har"
+    write_dump(dump, b"{}")
+    manifest = BuildManifest(path_to_manifest=str(tmp_path / "manifest.json"), build_settings=SETTINGS)
+    manifest.load()
+
+    assert manifest.get_unchanged_frames(str(dump)) is None
+    assert manifest.get_frames(str(dump)) == {}
+
+
+def test_unchanged_file_returns_saved_frames(tmp_path):
+    """Кадры неизменившегося файла берутся из манифеста."""
+    dump = tmp_path / "a.har"
+    write_dump(dump, b'{"log": {}}')
+    manifest = saved_manifest(tmp_path, [dump])
+
+    assert manifest.get_unchanged_frames(str(dump)) == FRAMES
+    assert not (tmp_path / "manifest.json.tmp").exists()
+
+
+def test_touched_file_with_same_content_is_unchanged(tmp_path):
+    """Файл с другим временем изменения, но тем же содержимым не считается изменившимся."""
+    dump = tmp_path / "a.har"
+    write_dump(dump, b'{"log": {}}', mtime_ns=1_000_000_000)
+    manifest = saved_manifest(tmp_path, [dump])
+
+    write_dump(dump, b'{"log": {}}', mtime_ns=2_000_000_000)
+    assert manifest.get_unchanged_frames(str(dump)) == FRAMES
+    assert manifest.files[str(dump)]["mtime_ns"] == 2_000_000_000
+
+
+def test_changed_file_is_detected(tmp_path):
+    """Изменение содержимого файла обнаруживается как при другом, так и при том же размере."""
+    resized_dump, same_size_dump = tmp_path / "a.har", tmp_path / "b.har"
+    write_dump(resized_dump, b'{"log": {}}', mtime_ns=1_000_000_000)
+    write_dump(same_size_dump, b'{"log": {}}', mtime_ns=1_000_000_000)
+    manifest = saved_manifest(tmp_path, [resized_dump, same_size_dump])
+
+    write_dump(resized_dump, b'{"log": {"entries": []}}', mtime_ns=1_000_000_000)
+    write_dump(same_size_dump, b'{"log": []}', mtime_ns=2_000_000_000)
+    assert manifest.get_unchanged_frames(str(resized_dump)) is None
+    assert manifest.get_unchanged_frames(str(same_size_dump)) is None
+    assert manifest.get_frames(str(same_size_dump)) == FRAMES
+
+
+def test_deleted_file_is_removed(tmp_path):
+    """Записи удалённых файлов дампов возвращаются и удаляются из манифеста."""
+    kept_dump, deleted_dump = tmp_path / "a.har", tmp_path / "b.har"
+    write_dump(kept_dump, b"{}")
+    write_dump(deleted_dump, b"{}")
+    manifest = saved_manifest(tmp_path, [kept_dump, deleted_dump])
+    deleted_dump.unlink()
+
+    removed_files = manifest.remove_missing(paths_to_files=[str(kept_dump)])
+    assert list(removed_files) == [str(deleted_dump)]
+    assert removed_files[str(deleted_dump)]["frames"] == FRAMES
+    assert list(manifest.files) == [str(kept_dump)]
+
+
+def test_settings_change_invalidates_manifest(tmp_path):
+    """Манифест, сохранённый с другими настройками генерации, не используется."""
+    dump = tmp_path / "a.har"
+    write_dump(dump, b"{}")
+    saved_manifest(tmp_path, [dump])
+
+    manifest = BuildManifest(path_to_manifest=str(tmp_path / "manifest.json"),
+                             build_settings={**SETTINGS, "json_schema_options": {"nullable": False}})
+    manifest.load()
+    assert manifest.get_unchanged_frames(str(dump)) is None
@@ -0,0 +1,98 @@
+import json
+import math
+
+import pytest
+
+from src.codec.codec import JSONCodec
+
+
+def nest(depth: int, leaf) -> list:
+    """Построение вложенных списков заданной глубины без рекурсии.
+
+    :param depth: Глубина вложенности.
+    :param leaf: Значение на самом глубоком уровне.
+    :return: Вложенные списки.
+
+    """
+    value = [leaf]
+    for _ in range(depth - 1):
+        value = [value]
+    return value
+
+
+def unnest(value: list) -> tuple[int, object]:
+    """Глубина вложенных списков и значение на самом глубоком уровне.
+
+    :param value: Вложенные списки.
+    :return: Глубина и значение.
+
+    """
+    depth = 0
+    while isinstance(value, list):
+        depth += 1
+        value = value[0]
+    return depth, value
+
+
+def test_loads_keeps_big_ints_exact(codec):
+    """Целые больше 64 бит декодируются без потери точности."""
+    big_int = 2 ** 70 + 1
+    assert JSONCodec.loads(f'{{"id": {big_int}, "small": 1}}') == {"id": big_int, "small": 1}
+    assert JSONCodec.loads(f"[{-big_int}]".encode("utf-8")) == [-big_int]
+
+
+def test_dumps_keeps_big_ints_exact(codec):
+    """Целые больше 64 бит сериализуются без потери точности."""
+    big_int = 2 ** 70 + 1
+    assert JSONCodec.loads(JSONCodec.dumps({"id": big_int})) == {"id": big_int}
+
+
+@pytest.mark.parametrize("value, literal", [(float("nan"), "NaN"),
+                                            (float("inf"), "Infinity"),
+                                            (float("-inf"), "-Infinity")])
+def test_dumps_writes_non_finite_floats_as_literals(codec, value, literal):
+    """NaN и Infinity записываются литералами, как в стандартном json, а не как null."""
+    data = JSONCodec.dumps({"value": value, "other": None})
+    assert literal in data
+    assert JSONCodec.dumps([value], indent=2) == json.dumps([value], indent=2)
+
+
+def test_loads_reads_non_finite_literals(codec):
+    """Литералы NaN и Infinity декодируются, как в стандартном json."""
+    nan, inf, minus_inf = JSONCodec.loads("[NaN, Infinity, -Infinity]")
+    assert math.isnan(nan)
+    assert inf == float("inf")
+    assert minus_inf == float("-inf")
+
+
+@pytest.mark.parametrize("value", ["\ud800", "a\udfffb", {"key\ud83d": ["😀", "é"]}])
+def test_lone_surrogates_round_trip(codec, value):
+    """Строки с одиночными суррогатами сериализуются в JSON, который кодируется в UTF-8."""
+    data = JSONCodec.dumps(value)
+    data.encode("utf-8")
+    assert JSONCodec.loads(data) == value
+    assert JSONCodec.loads(JSONCodec.dumps(value, ensure_ascii=False)) == value
+
+
+def test_deep_nesting_round_trip(codec):
+    """Значения глубже предела рекурсии сериализуются и десериализуются."""
+    value = nest(50000, {"key": "value"})
+    assert unnest(JSONCodec.loads(JSONCodec.dumps(value))) == (50000, {"key": "value"})
+    assert unnest(JSONCodec.loads(JSONCodec.dumps(nest(3000, 1.5), indent=2))) == (3000, 1.5)
+
+
+@pytest.mark.parametrize("indent", [None, 2, "\t"])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_iterative_codec_matches_json(indent, ensure_ascii):
+    """Сериализация и десериализация с явным стеком совпадают со стандартным json."""
+    value = nest(200, {"a": [1, "é\ud800", None, 1.5, float("inf"), {}, []], "b": {"c": True}, "": 2 ** 70})
+    data = json.dumps(value, ensure_ascii=ensure_ascii, indent=indent)
+    assert JSONCodec._dumps_iterative(value, ensure_ascii=ensure_ascii, indent=indent) == data
+    assert JSONCodec._loads_iterative(data) == value
+
+
+def test_codecs_decode_to_equal_values(codec):
+    """Все кодеки декодируют свою сериализацию в исходное значение."""
+    value = {"str": "é/\"\\", "int": -7, "float": 0.1, "bool": [True, False], "null": None, "nested": {"a": []}}
+    assert JSONCodec.loads(JSONCodec.dumps(value)) == value
+    assert JSONCodec.loads(JSONCodec.dumps(value, indent=2)) == value
@@ -0,0 +1,94 @@
+import copy
+
+import pytest
+
+from src.benchmark.dump_generator import DumpGenerator
+from src.configs.config import get_config_json
+from src.processor.json_schemes_generator import SOWASchemesGenerator
+
+
+@pytest.fixture
+def config_json(tmp_path) -> dict:
+    """Конфигурация с .har дампом и путями результатов во временной директории.
+
+    :return: Конфигурация в формате config.json.
+
+    """
+    config_json = copy.deepcopy(get_config_json())
+    config_json.update({
+        "HAR_FILES_DIR": str(tmp_path / "dumps" / "har"),
+        "JSON_SCHEMES_DIR": f"{tmp_path / 'schemes'}/",
+        "SCHEMES_CACHE_PATH": str(tmp_path / "cache" / "schemes_cache.sqlite3"),
+        "SCHEMES_INDEX_PATH": str(tmp_path / "cache" / "schemes_index.json"),
+        "BUILD_MANIFEST_PATH": str(tmp_path / "schemes_manifest.json"),
+        "RUN_REPORT_PATH": str(tmp_path / "run_report.json")
+    })
+    DumpGenerator(entries=60, endpoints=4, heterogeneity=0.5, seed=1).write_har_files(config_json["HAR_FILES_DIR"])
+    return config_json
+
+
+def read_schemes(tmp_path) -> dict:
+    """Содержимое всех записанных файлов схем.
+
+    :param tmp_path: Временная директория теста.
+    :return: Содержимое файлов по относительному пути.
+
+    """
+    schemes_dir = tmp_path / "schemes"
+    return {str(path.relative_to(schemes_dir)): path.read_bytes() for path in sorted(schemes_dir.rglob("*.json"))}
+
+
+def test_cached_build_matches_uncached(config_json, tmp_path):
+    """Повторная сборка берёт схемы из кэша и записывает те же файлы, что и сборка без кэша."""
+    SOWASchemesGenerator(config_json=config_json, is_from_har=True, use_schema_cache=False).build_sowa_schemes()
+    expected_schemes = read_schemes(tmp_path)
+    assert expected_schemes
+
+    cold_generator = SOWASchemesGenerator(config_json=config_json, is_from_har=True)
+    cold_generator.build_sowa_schemes()
+    warm_generator = SOWASchemesGenerator(config_json=config_json, is_from_har=True)
+    warm_generator.build_sowa_schemes()
+
+    assert cold_generator.schema_cache.misses > 0
+    assert warm_generator.schema_cache.misses == 0
+    assert warm_generator.schema_cache.hits == cold_generator.schema_cache.hits + cold_generator.schema_cache.misses
+    assert warm_generator.counters["skipped_array_items"] == cold_generator.counters["skipped_array_items"]
+    assert read_schemes(tmp_path) == expected_schemes
+
+
+def test_build_settings_ignore_runtime_variables(config_json):
+    """Настройки, не влияющие на схемы, не входят в настройки манифеста сборки."""
+    build_settings = SOWASchemesGenerator(config_json=config_json, is_from_har=True).get_build_settings()
+
+    runtime_config_json = copy.deepcopy(config_json)
+    runtime_config_json["VARIABLES"].update({"schemes_writer_workers": 1, "progress_interval_seconds": 1,
+                                             "api_max_workers": 1, "run_report_trace_memory": True})
+    runtime_config_json["SCHEMES_CACHE_PATH"] += ".other"
+    assert SOWASchemesGenerator(config_json=runtime_config_json, is_from_har=True).get_build_settings() \
+        == build_settings
+
+    options_config_json = copy.deepcopy(config_json)
+    options_config_json["VARIABLES"]["json_schema_options"]["stringMinLength"] = 1
+    assert SOWASchemesGenerator(config_json=options_config_json, is_from_har=True).get_build_settings() \
+        != build_settings
+
+
+def test_incremental_build_rebuilds_only_changed_files(config_json, tmp_path):
+    """Инкрементальная сборка без изменений дампов не перерабатывает файлы и не меняет схемы."""
+    SOWASchemesGenerator(config_json=config_json, is_from_har=True, is_incremental=True).build_sowa_schemes()
+    expected_schemes = read_schemes(tmp_path)
+
+    generator = SOWASchemesGenerator(config_json=config_json, is_from_har=True, is_incremental=True)
+    generator.build_sowa_schemes()
+    assert generator.schema_cache.hits + generator.schema_cache.misses == 0
+    assert read_schemes(tmp_path) == expected_schemes
+
+
+def test_pool_build_matches_serial(config_json, tmp_path):
+    """Сборка в пуле процессов записывает те же файлы, что и последовательная."""
+    SOWASchemesGenerator(config_json=config_json, is_from_har=True, use_schema_cache=False).build_sowa_schemes()
+    expected_schemes = read_schemes(tmp_path)
+
+    SOWASchemesGenerator(config_json=config_json, is_from_har=True, use_schema_cache=False,
+                         workers=2, entries_chunk_size=7).build_sowa_schemes()
+    assert read_schemes(tmp_path) == expected_schemes
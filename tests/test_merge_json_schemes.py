@@ -0,0 +1,147 @@
+import copy
+import random
+from functools import reduce
+
+import pytest
+
+from src.generator.schema_interner import SchemaInterner
+from src.handlers.merge_json_schemes import MergeJSONSchemes
+
+# Схемы, на которых объединение совпадает с jsonmerge: одинаковые ключевые слова имеют одинаковые значения,
+# отличаются только наборы свойств
+CORPUS = [
+    {"type": "object", "properties": {"id": {"type": "integer"}, "name": {"type": "string", "maxLength": 255}}},
+    {"type": "object", "properties": {"id": {"type": "integer"},
+                                      "tags": {"type": "array", "items": [{"type": "string"}]}}},
+    {"type": "object", "properties": {"profile": {"type": "object",
+                                                  "properties": {"email": {"type": "string"}}}}},
+    {"type": "object", "properties": {"profile": {"type": "object",
+                                                  "properties": {"phone": {"type": "string"},
+                                                                 "address": {"type": "object", "properties": {}}}}}},
+    {"type": "object", "properties": {"name": {"type": "string", "maxLength": 255}}, "additionalProperties": False},
+    {"$schema": "http://json-schema.org/draft-04/schema#", "type": "object", "properties": {}},
+]
+
+
+def merge_all(schemes: list, schema_interner: SchemaInterner = None) -> dict:
+    """Объединение схем по порядку, как объединяются кадры генератора.
+
+    :param schemes: Схемы. Не изменяются.
+    :param schema_interner: Хранилище канонических узлов.
+    :return: Объединённая схема.
+
+    """
+    merged_schema = {}
+    for schema in copy.deepcopy(schemes):
+        if schema_interner is not None:
+            schema = schema_interner.intern(schema)
+        merged_schema = MergeJSONSchemes.merge_schemes_in_place(target=merged_schema,
+                                                                source=schema,
+                                                                schema_interner=schema_interner)
+    return merged_schema
+
+
+def merge_into_first(schemes: list, schema_interner: SchemaInterner = None) -> dict:
+    """Объединение схем со схемой-приёмником, равной первой схеме.
+
+    :param schemes: Схемы. Не изменяются.
+    :param schema_interner: Хранилище канонических узлов.
+    :return: Объединённая схема.
+
+    """
+    schemes = copy.deepcopy(schemes)
+    if schema_interner is not None:
+        schemes = [schema_interner.intern(schema) for schema in schemes]
+
+    merged_schema = schemes[0]
+    for schema in schemes[1:]:
+        merged_schema = MergeJSONSchemes.merge_schemes_in_place(target=merged_schema,
+                                                                source=schema,
+                                                                schema_interner=schema_interner)
+    return merged_schema
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_union_matches_jsonmerge_on_corpus():
+    """На схемах без конфликтующих значений объединение совпадает с прежним объединением через jsonmerge."""
+    jsonmerge = pytest.importorskip("jsonmerge")
+
+    for count in range(1, len(CORPUS) + 1):
+        expected_schema = reduce(jsonmerge.merge, copy.deepcopy(CORPUS[:count]), {})
+        assert merge_all(CORPUS[:count]) == expected_schema
+        assert merge_all(CORPUS[:count], SchemaInterner()) == expected_schema
+
+
+@pytest.mark.parametrize("schemes, expected_schema", [
+    ([{"type": "string"}, {"type": ["integer", "null"]}, {"type": ["null", "string"]}],
+     {"type": ["string", "integer", "null"]}),
+    ([{"type": "string", "maxLength": 255, "minLength": 0}, {"type": "string", "maxLength": 4096, "minLength": 1}],
+     {"type": "string", "maxLength": 4096, "minLength": 0}),
+    ([{"maximum": 10, "minimum": 5, "maxItems": 1}, {"maximum": 7, "minimum": -1, "maxItems": 3}],
+     {"maximum": 10, "minimum": -1, "maxItems": 3}),
+    ([{"required": ["a", "b"]}, {"required": ["b", "c"]}], {"required": ["b"]}),
+    ([{"required": ["a"]}, {"required": ["b"]}], {}),
+    ([{"required": ["a"]}, {}], {}),
+    ([{"type": "object"}, {"required": ["a"]}], {"type": "object"}),
+    ([{"items": [{"type": "string"}]}, {"items": [{"type": "integer"}, {"type": "null"}]}],
+     {"items": [{"type": ["string", "integer"]}, {"type": "null"}]}),
+    ([{"format": "date-time", "pattern": "a"}, {"format": "uuid"}], {"format": "date-time", "pattern": "a"}),
+])
+def test_union_rules(schemes, expected_schema):
+    """Правила объединения, которыми объединение намеренно отличается от jsonmerge."""
+    assert merge_into_first(schemes) == expected_schema
+    assert merge_into_first(schemes, SchemaInterner()) == expected_schema
+
+
+def random_schema(rnd: random.Random, depth: int = 0) -> dict:
+    """Случайная схема из типов, свойств, элементов массивов и ограничений.
+
+    :param rnd: Генератор случайных чисел.
+    :param depth: Глубина узла.
+    :return: Схема.
+
+    """
+    schema = {"type": rnd.choice(["object", "array", "string", ["integer", "null"]])}
+    if rnd.random() < 0.5:
+        schema[rnd.choice(["maxLength", "minimum", "maxItems"])] = rnd.randint(0, 5)
+    if depth < 4 and schema["type"] == "object":
+        schema["properties"] = {name: random_schema(rnd, depth + 1) for name in rnd.sample("abcd", rnd.randint(0, 3))}
+        if schema["properties"]:
+            schema["required"] = sorted(schema["properties"])[:rnd.randint(1, 2)]
+    elif depth < 4 and schema["type"] == "array":
+        schema["items"] = [random_schema(rnd, depth + 1) for _ in range(rnd.randint(0, 2))]
+    return schema
+
+
+def test_interned_merge_matches_plain_merge_and_keeps_canonical_nodes():
+    """Объединение с общими узлами даёт тот же результат и не изменяет канонические узлы."""
+    rnd = random.Random(0)
+    for _ in range(200):
+        schemes = [random_schema(rnd) for _ in range(rnd.randint(1, 6))]
+        schema_interner = SchemaInterner()
+        interned_schemes = [schema_interner.intern(copy.deepcopy(schema)) for schema in schemes]
+        interned_copies = copy.deepcopy(interned_schemes)
+
+        merged_schema = {}
+        for schema in interned_schemes:
+            merged_schema = MergeJSONSchemes.merge_schemes_in_place(target=merged_schema,
+                                                                    source=schema,
+                                                                    schema_interner=schema_interner)
+
+        assert merged_schema == merge_all(schemes)
+        assert interned_schemes == interned_copies
+
+
+def test_deep_schemes_merge():
+    """Схемы глубже предела рекурсии объединяются."""
+    depth = 20000
+    left, right = {"type": "string"}, {"type": "integer"}
+    for _ in range(depth):
+        left = {"type": "object", "properties": {"child": left}}
+        right = {"type": "object", "properties": {"child": right}, "maxLength": 1}
+
+    node = MergeJSONSchemes.merge_schemes_in_place(target=left, source=right)
+    for _ in range(depth):
+        assert node["maxLength"] == 1
+        node = node["properties"]["child"]
+    assert node == {"type": ["string", "integer"]}
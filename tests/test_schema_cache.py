@@ -0,0 +1,111 @@
+import sqlite3
+
+from src.cache.schema_cache import SchemaCache
+
+OPTIONS = {"schemaVersion": "http://json-schema.org/draft-04/schema#", "stringMaxLengths": [255, 4096]}
+SCHEMA = {"type": ["object", "null"], "properties": {"id": {"type": ["integer", "null"]}}}
+
+
+def make_cache(tmp_path, options: dict = None, **kwargs) -> SchemaCache:
+    """Создание кэша схем во временной директории.
+
+    :param tmp_path: Временная директория теста.
+    :param options: Опции генерации схемы. По умолчанию OPTIONS.
+    :return: Кэш схем.
+
+    """
+    return SchemaCache(path_to_cache=str(tmp_path / "cache" / "schemes.sqlite"),
+                       options=OPTIONS if options is None else options,
+                       **kwargs)
+
+
+def test_miss_then_hit(tmp_path):
+    """Схема, которой нет в кэше, после put берётся из кэша вместе с количеством пропущенных элементов."""
+    cache = make_cache(tmp_path)
+    key = cache.make_key(payload_type="json_data", payload='{"id": 1}')
+
+    assert cache.get(key) is None
+    cache.put(key, SCHEMA, skipped_array_items=3)
+    assert cache.get(key) == (SCHEMA, 3)
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_hit_after_reopen(tmp_path):
+    """Схемы сохраняются в базе и доступны новому экземпляру кэша."""
+    cache = make_cache(tmp_path)
+    key = cache.make_key(payload_type="object", payload={"id": 1})
+    cache.put(key, SCHEMA, skipped_array_items=2)
+    cache.close()
+
+    cache = make_cache(tmp_path)
+    assert cache.get(key) == (SCHEMA, 2)
+    assert cache.get(cache.make_key(payload_type="object", payload={"id": 2})) is None
+    cache.close()
+
+
+def test_key_depends_on_payload_type_and_content(tmp_path):
+    """Ключ различается для разных типов данных и разного содержимого полезной нагрузки."""
+    cache = make_cache(tmp_path)
+    keys = {cache.make_key(payload_type="json_data", payload='{"id": 1}'),
+            cache.make_key(payload_type="object", payload='{"id": 1}'),
+            cache.make_key(payload_type="json_data", payload='{"id": 2}'),
+            cache.make_key(payload_type="object", payload={"id": 2}),
+            cache.make_key(payload_type="object", payload={"id": "2"})}
+    assert len(keys) == 5
+    assert cache.make_key(payload_type="object", payload={"id": 2}) in keys
+
+
+def test_options_change_invalidates_entries(tmp_path):
+    """Записи, сохранённые с другими опциями генерации, не используются."""
+    cache = make_cache(tmp_path)
+    key = cache.make_key(payload_type="json_data", payload='{"id": 1}')
+    cache.put(key, SCHEMA)
+    cache.close()
+
+    cache = make_cache(tmp_path, options={**OPTIONS, "stringMaxLengths": [255]})
+    assert cache.get(cache.make_key(payload_type="json_data", payload='{"id": 1}')) is None
+    cache.close()
+
+
+def test_version_change_invalidates_entries(tmp_path, monkeypatch):
+    """Записи, сохранённые другой версией алгоритма генерации, не используются."""
+    cache = make_cache(tmp_path)
+    cache.put(cache.make_key(payload_type="json_data", payload="[]"), SCHEMA)
+    cache.close()
+
+    monkeypatch.setattr(SchemaCache, "SCHEMA_CACHE_VERSION", SchemaCache.SCHEMA_CACHE_VERSION + 1)
+    cache = make_cache(tmp_path)
+    assert cache.get(cache.make_key(payload_type="json_data", payload="[]")) is None
+    cache.close()
+
+
+def test_old_database_gets_skipped_column(tmp_path):
+    """База кэша без столбца skipped_array_items дополняется им."""
+    path_to_cache = tmp_path / "cache" / "schemes.sqlite"
+    path_to_cache.parent.mkdir()
+    connection = sqlite3.connect(path_to_cache)
+    connection.execute("CREATE TABLE schemes "
+                       "(key TEXT PRIMARY KEY, schema TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)")
+    connection.execute("INSERT INTO schemes VALUES ('old', '{}', 2, 0)")
+    connection.commit()
+    connection.close()
+
+    cache = make_cache(tmp_path)
+    assert cache.get("old") == ({}, 0)
+    key = cache.make_key(payload_type="json_data", payload="{}")
+    cache.put(key, SCHEMA, skipped_array_items=5)
+    cache.flush()
+    assert cache.get(key) == (SCHEMA, 5)
+    cache.close()
+
+
+def test_close_evicts_least_recently_used(tmp_path):
+    """При закрытии вытесняются давно не использованные записи, пока размер больше лимита."""
+    cache = make_cache(tmp_path, max_size_mb=0)
+    cache.put(cache.make_key(payload_type="json_data", payload="{}"), SCHEMA)
+    cache.close()
+
+    cache = make_cache(tmp_path)
+    assert cache.get(cache.make_key(payload_type="json_data", payload="{}")) is None
+    cache.close()
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from src.codec.codec import JSONCodec
+from src.handlers.schema_writer import SchemaWriter
+
+SCHEMA = {"type": "object", "properties": {"name": {"type": "string", "maxLength": 255}}}
+
+
+def list_files(path) -> list:
+    """Относительные пути всех файлов директории.
+
+    :param path: Директория.
+    :return: Отсортированные пути файлов.
+
+    """
+    return sorted(str(file.relative_to(path)) for file in path.rglob("*") if file.is_file())
+
+
+def test_flush_writes_schemes_and_index(tmp_path):
+    """Схемы записываются в создаваемые директории, временные файлы не остаются."""
+    writer = SchemaWriter(path_to_index=str(tmp_path / "index.json"))
+    writer.add(path_to_schema=str(tmp_path / "schemes" / "users" / "response.json"), schema=SCHEMA)
+    writer.add(path_to_schema=str(tmp_path / "schemes" / "users" / "request.json"), schema={})
+    writer.flush()
+
+    assert list_files(tmp_path) == ["index.json", "schemes/users/request.json", "schemes/users/response.json"]
+    assert JSONCodec.loads((tmp_path / "schemes" / "users" / "response.json").read_text("utf-8")) == SCHEMA
+    assert writer.written == 2
+
+
+def test_last_added_schema_wins(tmp_path):
+    """При повторном добавлении схемы в тот же путь записывается последняя схема."""
+    path_to_schema = tmp_path / "response.json"
+    writer = SchemaWriter()
+    writer.add(path_to_schema=str(path_to_schema), schema={"type": "string"})
+    writer.add(path_to_schema=str(path_to_schema), schema=SCHEMA)
+    writer.flush()
+
+    assert JSONCodec.loads(path_to_schema.read_text("utf-8")) == SCHEMA
+    assert writer.written == 1
+
+
+def test_unchanged_schema_is_not_rewritten(tmp_path):
+    """Файл с тем же содержимым не перезаписывается, в том числе без записи в индексе."""
+    path_to_schema = tmp_path / "response.json"
+    writer = SchemaWriter(path_to_index=str(tmp_path / "index.json"))
+    writer.add(path_to_schema=str(path_to_schema), schema=SCHEMA)
+    writer.flush()
+    os.utime(path_to_schema, ns=(1_000_000_000, 1_000_000_000))
+
+    for path_to_index in (str(tmp_path / "index.json"), None):
+        writer = SchemaWriter(path_to_index=path_to_index)
+        writer.add(path_to_schema=str(path_to_schema), schema=SCHEMA)
+        writer.flush()
+        assert (writer.written, writer.unchanged) == (0, 1)
+        assert path_to_schema.stat().st_mtime_ns == 1_000_000_000
+
+
+def test_externally_modified_schema_is_rewritten(tmp_path):
+    """Файл, изменённый не записью схем, перезаписывается, даже если его размер не изменился."""
+    path_to_schema = tmp_path / "response.json"
+    writer = SchemaWriter(path_to_index=str(tmp_path / "index.json"))
+    writer.add(path_to_schema=str(path_to_schema), schema={"type": "string"})
+    writer.flush()
+    path_to_schema.write_text(path_to_schema.read_text("utf-8").replace("string", "strinG"), "utf-8")
+
+    writer = SchemaWriter(path_to_index=str(tmp_path / "index.json"))
+    writer.add(path_to_schema=str(path_to_schema), schema={"type": "string"})
+    writer.flush()
+    assert writer.written == 1
+    assert JSONCodec.loads(path_to_schema.read_text("utf-8")) == {"type": "string"}
+
+
+def test_failed_write_keeps_previous_file(tmp_path, monkeypatch):
+    """При ошибке записи прежний файл схемы остаётся целым, а временный файл удаляется."""
+    path_to_schema = tmp_path / "response.json"
+    writer = SchemaWriter()
+    writer.add(path_to_schema=str(path_to_schema), schema={"type": "string"})
+    writer.flush()
+    previous_content = path_to_schema.read_bytes()
+
+    def fail_replace(source, destination):
+        raise OSError("replace failed")
+
+    monkeypatch.setattr(os, "replace", fail_replace)
+    writer.add(path_to_schema=str(path_to_schema), schema=SCHEMA)
+    with pytest.raises(OSError, match="replace failed"):
+        writer.flush()
+
+    assert path_to_schema.read_bytes() == previous_content
+    assert list_files(tmp_path) == ["response.json"]